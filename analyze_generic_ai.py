@@ -140,6 +140,8 @@ def analyze_generic_ai_code():
     else:
         print(f"   ✅ Quality EXCEEDS claimed completeness")
     
+    scanner.close()  # wait for the report files
+    
     print(f"\n📄 Detailed reports saved to: {generic_ai_path}/.vibecode/longcot/")
     print("=" * 70)
     
@@ -6,8 +6,10 @@ Agent 05: Safe File System Integration and Change Application
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from core.agent_executor import AgentExecutor, AgentResult, Artifact
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import os
+import secrets
 import shutil
 
 
@@ -116,18 +118,22 @@ class IntegratorExecutor(AgentExecutor):
         failed = []
         insights = []
         
-        # Create backup session
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Create backup session (pid + random suffix so runs within the
+        # same second never share a backup directory)
+        session_id = f"{datetime.now(timezone.utc):%Y%m%d_%H%M%S}_{os.getpid()}_{secrets.token_hex(3)}"
         session_backup = self.backup_dir / session_id
-        session_backup.mkdir(exist_ok=True)
+        session_backup.mkdir(parents=True, exist_ok=False)
         
         for change in changes:
             path = change.get('path', '')
             content = change.get('content', '')
             operation = change.get('operation', 'create')
             
+            # Encode once: the size check and the write both use these bytes
+            encoded = content.encode('utf-8')
+            
             # Safety checks
-            safety_result = self._safety_check(path, content)
+            safety_result = self._safety_check(path, encoded)
             if not safety_result[0]:
                 failed.append({
                     'path': path,
@@ -157,7 +163,7 @@ class IntegratorExecutor(AgentExecutor):
                     full_path.parent.mkdir(parents=True, exist_ok=True)
                     
                     # Write content
-                    full_path.write_text(content, encoding='utf-8')
+                    full_path.write_bytes(encoded)
                     applied.append({'path': path, 'operation': operation})
                     
             except Exception as e:
@@ -195,8 +201,8 @@ class IntegratorExecutor(AgentExecutor):
             confidence=0.9 if status == "success" else 0.5
         )
 
-    def _safety_check(self, path: str, content: str) -> Tuple[bool, str]:
-        """Perform safety checks on a file operation"""
+    def _safety_check(self, path: str, content: bytes) -> Tuple[bool, str]:
+        """Perform safety checks on a file operation (content is UTF-8 bytes)"""
         # Check for path traversal
         if '..' in path:
             return False, "Path traversal detected (..)"
@@ -217,15 +223,15 @@ class IntegratorExecutor(AgentExecutor):
             return False, f"Content too large ({len(content)} bytes > {self.max_file_size})"
         
         # Check for potential secrets in content
-        secret_patterns = ['password=', 'api_key=', 'secret=', 'token=']
+        secret_patterns = [b'password=', b'api_key=', b'secret=', b'token=']
         content_lower = content.lower()
         for pattern in secret_patterns:
             if pattern in content_lower:
                 # Check if it's a real value (not a placeholder)
                 import re
-                real_secret = re.search(rf'{pattern}["\']?[a-zA-Z0-9]{{10,}}', content_lower)
+                real_secret = re.search(re.escape(pattern) + rb'["\']?[a-zA-Z0-9]{10,}', content_lower)
                 if real_secret:
-                    return False, f"Potential hardcoded secret detected: {pattern}"
+                    return False, f"Potential hardcoded secret detected: {pattern.decode()}"
         
         return True, "OK"
 
@@ -6,9 +6,144 @@ Agent 07: Automated Bug Fixing and Error Recovery
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from core.agent_executor import AgentExecutor, AgentResult, Artifact
+import os
 import re
-import json
-from datetime import datetime
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+
+
+# Error classifiers, combined into one alternation so a single scan of the
+# text picks the leftmost error; the matching branch name is the error type
+_RAW_PATTERNS = [
+    ('typescript', r"TS(?:\d+):\s*(?:.+?)(?:\n|$)"),
+    ('eslint', r"error\s+(?:.+?)\s+(?:.+?)(?:\n|$)"),
+    ('python', r"(?:\w+Error):\s*(?:.+?)(?:\n|$)"),
+    ('node', r"Error:\s*(?:.+?)(?:\n|$)"),
+]
+_COMBINED = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _RAW_PATTERNS),
+    re.IGNORECASE
+)
+
+# file:line[:col] location; bounded quantifiers keep the scan linear even on
+# long runs of non-space text (e.g. minified code or base64 blobs)
+_FILE_LINE_RE = re.compile(r"(?:at\s+)?([^\s:]{1,256}):(\d{1,7})(?::(\d{1,7}))?", re.IGNORECASE)
+
+# Directories never searched when locating error files
+_SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '.venv', '__pycache__'}
+
+# Common auto-imports for missing names
+_AUTO_IMPORTS: Dict[str, str] = {
+    'useState': "import { useState } from 'react';",
+    'useEffect': "import { useEffect } from 'react';",
+    'useCallback': "import { useCallback } from 'react';",
+    'useMemo': "import { useMemo } from 'react';",
+    'React': "import React from 'react';",
+    'Path': "from pathlib import Path",
+    'Dict': "from typing import Dict",
+    'List': "from typing import List",
+    'Optional': "from typing import Optional",
+}
+
+_MISSING_RE = re.compile(r"['\"](\w+)['\"].*(?:not defined|cannot find)", re.IGNORECASE)
+
+
+@dataclass
+class Attempt:
+    """One recorded fix attempt (slotted: no per-record __dict__)"""
+    __slots__ = ('ts', 'error_type', 'description', 'success')
+    ts: float
+    error_type: Optional[str]
+    description: str
+    success: bool
+
+    def to_json(self) -> str:
+        """Encode as one JSON line, formatting the timestamp"""
+        import json
+        from datetime import datetime
+        
+        record = asdict(self)
+        record['timestamp'] = datetime.fromtimestamp(record.pop('ts')).isoformat(timespec='seconds')
+        return json.dumps(record, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, line: str) -> 'Attempt':
+        """Decode a line written by to_json"""
+        import json
+        from datetime import datetime
+        
+        record = json.loads(line)
+        timestamp = record.get('timestamp')
+        return cls(
+            ts=datetime.fromisoformat(timestamp).timestamp() if timestamp else 0.0,
+            error_type=record.get('error_type'),
+            description=record.get('description', ''),
+            success=bool(record.get('success', False))
+        )
+
+
+# Report and prompt templates, rendered with a single format_map call
+_ESCALATION_TEMPLATE = """# ⚠️ Medic Circuit Breaker Triggered
+
+**Reason:** {reason}
+
+## Attempt History
+
+{history}
+## Recommendation
+
+Human intervention required. The automated fix system has reached its limits.
+
+Please review:
+1. The error messages in the attempt history
+2. The files involved
+3. Consider reverting recent changes
+
+After manual review, run Agent 00 (Auditor) to re-assess the codebase."""
+
+_FIX_PROMPT_TEMPLATE = """# Bug Fix Request
+
+## Error Information
+- **Type:** {type}
+- **Message:** {message}
+- **File:** {file}
+- **Line:** {line}
+
+## Safety Rules (CRITICAL)
+1. DO NOT delete any files
+2. DO NOT replace more than {max_lines} lines
+3. DO NOT modify more than {max_files} files
+4. Always read the file BEFORE making changes
+5. Make the SMALLEST possible fix
+
+## Instructions
+1. Read the error file
+2. Identify the root cause
+3. Apply a minimal, surgical fix
+4. Verify the fix doesn't break other code
+
+Report what you fixed and why."""
+
+_MEDIC_REPORT_TEMPLATE = """# Medic Report
+
+## Error Analyzed
+- **Type:** {type}
+- **File:** {file}
+- **Line:** {line}
+- **Message:** {message}
+
+## Actions Taken
+
+{actions}
+## Result
+
+{result}
+
+## Next Steps
+
+{next_review}
+{next_testing}"""
 
 
 class MedicExecutor(AgentExecutor):
@@ -26,18 +161,28 @@ class MedicExecutor(AgentExecutor):
         
         # Safety limits
         self.max_lines_per_fix = 50
+        self.max_fix_file_size = 1024 * 1024  # 1MB
         self.max_files_per_fix = 2
         self.max_attempts = 3
-        self.attempt_history = []
+        self.attempt_history: deque = deque(maxlen=10)
+        
+        # Rolling circuit-breaker windows, updated as attempts are recorded
+        self._recent_results = deque(maxlen=5)
+        self._recent_types = deque(maxlen=3)
+        
+        # File lookup caches (reset on each execute)
+        self._reset_file_lookup()
         
         # State tracking
-        self.state_file = workspace / ".vibecode" / "medic_state.json"
+        self.state_file = workspace / ".vibecode" / "medic_state.jsonl"
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self._state_lines = 0
 
     def execute(self, query: str, context: Dict, **kwargs) -> AgentResult:
         """Execute bug fixing"""
         # Load state
         self._load_state()
+        self._reset_file_lookup()
         
         # Check circuit breaker
         if self._check_circuit_breaker():
@@ -64,70 +209,75 @@ class MedicExecutor(AgentExecutor):
         return self._apply_pattern_fix(error_info, context)
 
     def _load_state(self) -> None:
-        """Load medic state"""
+        """Load medic state (last 10 attempts from the JSON-lines log)"""
         try:
             if self.state_file.exists():
-                state = json.loads(self.state_file.read_text(encoding='utf-8'))
-                self.attempt_history = state.get('attempts', [])
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self._state_lines = 0
+                    tail = deque(maxlen=10)
+                    for line in f:
+                        self._state_lines += 1
+                        tail.append(line)
+                self.attempt_history = deque((Attempt.from_json(line) for line in tail if line.strip()), maxlen=10)
         except Exception:
-            self.attempt_history = []
+            self.attempt_history = deque(maxlen=10)
+        
+        self._recent_results = deque((a.success for a in self.attempt_history), maxlen=5)
+        self._recent_types = deque((a.error_type for a in self.attempt_history), maxlen=3)
 
-    def _save_state(self) -> None:
-        """Save medic state"""
+    def _save_state(self, attempt: Attempt) -> None:
+        """Append one attempt record; compact the log once it grows large"""
         try:
-            state = {
-                'attempts': self.attempt_history[-10:],  # Keep last 10
-                'last_updated': datetime.now().isoformat()
-            }
-            self.state_file.write_text(json.dumps(state, indent=2), encoding='utf-8')
+            if self._state_lines >= 100:
+                # Periodic compaction: keep only the last 10 attempts
+                records = list(self.attempt_history)
+                self.state_file.write_text(
+                    "".join(r.to_json() + "\n" for r in records),
+                    encoding='utf-8'
+                )
+                self._state_lines = len(records)
+            else:
+                with open(self.state_file, 'a', encoding='utf-8') as f:
+                    f.write(attempt.to_json() + "\n")
+                self._state_lines += 1
         except Exception:
             pass
 
+    def _record_attempt(self, error_info: Dict, success: bool) -> None:
+        """Record a fix attempt in memory and in the state log"""
+        attempt = Attempt(
+            ts=time.time(),  # formatted only when written out
+            error_type=error_info.get('type'),
+            description=(error_info.get('message') or '')[:100],
+            success=success
+        )
+        self.attempt_history.append(attempt)
+        self._recent_results.append(success)
+        self._recent_types.append(attempt.error_type)
+        self._save_state(attempt)
+
     def _check_circuit_breaker(self) -> bool:
         """Check if circuit breaker should trigger"""
         # Check total attempts in session
-        if len(self.attempt_history) >= 5:
-            recent = self.attempt_history[-5:]
-            failed = sum(1 for a in recent if not a.get('success', False))
-            if failed >= 4:
-                return True
+        results = self._recent_results
+        if len(results) == results.maxlen and sum(1 for r in results if not r) >= 4:
+            return True
         
         # Check same error repeated
-        if len(self.attempt_history) >= 3:
-            recent_errors = [a.get('error_type') for a in self.attempt_history[-3:]]
-            if len(set(recent_errors)) == 1 and recent_errors[0]:
-                return True
+        types = self._recent_types
+        if len(types) == types.maxlen and types[0] and len(set(types)) == 1:
+            return True
         
         return False
 
     def _escalate(self, reason: str) -> AgentResult:
         """Escalate to human intervention"""
-        report = [
-            "# ⚠️ Medic Circuit Breaker Triggered",
-            "",
-            f"**Reason:** {reason}",
-            "",
-            "## Attempt History",
-            ""
-        ]
-        
-        for attempt in self.attempt_history[-5:]:
-            status = "✅" if attempt.get('success') else "❌"
-            report.append(f"- {status} {attempt.get('error_type', 'unknown')}: {attempt.get('description', 'N/A')}")
-        
-        report.extend([
-            "",
-            "## Recommendation",
-            "",
-            "Human intervention required. The automated fix system has reached its limits.",
-            "",
-            "Please review:",
-            "1. The error messages in the attempt history",
-            "2. The files involved",
-            "3. Consider reverting recent changes",
-            "",
-            "After manual review, run Agent 00 (Auditor) to re-assess the codebase."
-        ])
+        history = "".join(
+            f"- {'✅' if attempt.success else '❌'} "
+            f"{attempt.error_type}: {attempt.description}\n"
+            for attempt in list(self.attempt_history)[-5:]
+        )
+        report = _ESCALATION_TEMPLATE.format_map({'reason': reason, 'history': history})
         
         return AgentResult(
             agent_id="07",
@@ -135,7 +285,7 @@ class MedicExecutor(AgentExecutor):
             artifacts=[Artifact(
                 type="report",
                 path="medic_escalation.md",
-                content="\n".join(report)
+                content=report
             )],
             insights=[reason, "Human intervention required"],
             next_recommended_agent=None,  # Human intervention
@@ -157,31 +307,32 @@ class MedicExecutor(AgentExecutor):
             error = context['error']
             if isinstance(error, dict):
                 error_info.update(error)
+                # Fast path: a complete structured error needs no text parsing
+                if error_info.get('type') and error_info.get('message') and error_info.get('file'):
+                    return error_info
             else:
                 error_info['message'] = str(error)
         
-        # Parse from query
-        text = query + " " + str(context)
-        
-        # Common error patterns
-        patterns = {
-            'typescript': r"TS(\d+):\s*(.+?)(?:\n|$)",
-            'eslint': r"error\s+(.+?)\s+(.+?)(?:\n|$)",
-            'python': r"(\w+Error):\s*(.+?)(?:\n|$)",
-            'node': r"Error:\s*(.+?)(?:\n|$)",
-            'file_line': r"(?:at\s+)?([^\s:]+):(\d+)(?::(\d+))?",
-        }
+        # Parse from query plus the context fields that can carry error text
+        # (stringifying the whole context is costly on large agent contexts)
+        parts = [query]
+        for key in ('error', 'stderr', 'stdout', 'message', 'output'):
+            value = context.get(key)
+            if value:
+                parts.append(value if isinstance(value, str) else str(value))
+        text = "\n".join(parts)
+        
+        # Classify in one pass
+        match = _COMBINED.search(text)
+        if match:
+            error_info['type'] = match.lastgroup
+            error_info['message'] = match.group(match.lastgroup)
         
-        # Try to extract error type
-        for error_type, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if error_type == 'file_line':
-                    error_info['file'] = match.group(1)
-                    error_info['line'] = int(match.group(2))
-                else:
-                    error_info['type'] = error_type
-                    error_info['message'] = match.group(0)
+        # Extract file:line location
+        match = _FILE_LINE_RE.search(text)
+        if match:
+            error_info['file'] = match.group(1)
+            error_info['line'] = int(match.group(2))
         
         # Check if we have enough info
         if error_info['message'] or error_info['type']:
@@ -198,13 +349,7 @@ class MedicExecutor(AgentExecutor):
             result = self.reasoning_engine.run_goal(prompt, minimal_context)
             
             # Record attempt
-            self.attempt_history.append({
-                'timestamp': datetime.now().isoformat(),
-                'error_type': error_info.get('type'),
-                'description': error_info.get('message', '')[:100],
-                'success': result.get('success', False)
-            })
-            self._save_state()
+            self._record_attempt(error_info, result.get('success', False))
             
             if result.get('success'):
                 return AgentResult(
@@ -235,44 +380,44 @@ class MedicExecutor(AgentExecutor):
         if file_path and file_path.exists():
             # Read the file
             try:
-                content = file_path.read_text(encoding='utf-8')
-                original_content = content
+                # Skip large (typically minified/generated) files before reading
+                size = file_path.stat().st_size
+                if size > self.max_fix_file_size:
+                    raise ValueError(f"file too large ({size} bytes); skipped")
+                
+                # Bytes in, bytes out: no newline translation either way
+                content = file_path.read_bytes().decode('utf-8')
                 
-                # Apply known fixes
-                error_type = error_info.get('type', '').lower()
-                message = error_info.get('message', '').lower()
+                # Split once; fix helpers edit this list in place
+                lines = content.splitlines(keepends=True)
+                original_line_count = len(lines)
+                
+                # Apply known fixes (message lowered once, shared with helpers)
+                message = (error_info.get('message') or '').lower()
                 
                 # Fix: Missing import
                 if 'not defined' in message or 'cannot find' in message:
-                    fix_result = self._fix_missing_import(content, error_info)
-                    if fix_result:
-                        content = fix_result
+                    if self._fix_missing_import(lines, content, error_info):
                         fixed = True
                         insights.append("Added missing import")
                 
                 # Fix: Type errors
                 elif 'type' in message and ('assignable' in message or 'compatible' in message):
-                    fix_result = self._fix_type_error(content, error_info)
-                    if fix_result:
-                        content = fix_result
+                    if self._fix_type_error(lines, error_info):
                         fixed = True
                         insights.append("Fixed type annotation")
                 
                 # Fix: Syntax errors
                 elif 'syntax' in message or 'unexpected' in message:
-                    fix_result = self._fix_syntax_error(content, error_info)
-                    if fix_result:
-                        content = fix_result
+                    if self._fix_syntax_error(lines, error_info, message):
                         fixed = True
                         insights.append("Fixed syntax error")
                 
-                # Write back if fixed
-                if fixed and content != original_content:
+                # Write back if fixed (join exactly once)
+                if fixed:
                     # Safety check: don't change too many lines
-                    original_lines = original_content.count('\n')
-                    new_lines = content.count('\n')
-                    if abs(new_lines - original_lines) <= self.max_lines_per_fix:
-                        file_path.write_text(content, encoding='utf-8')
+                    if abs(len(lines) - original_line_count) <= self.max_lines_per_fix:
+                        file_path.write_bytes("".join(lines).encode('utf-8'))
                         insights.append(f"Modified {file_path.name}")
                     else:
                         fixed = False
@@ -284,13 +429,7 @@ class MedicExecutor(AgentExecutor):
             insights.append("Could not locate error file")
         
         # Record attempt
-        self.attempt_history.append({
-            'timestamp': datetime.now().isoformat(),
-            'error_type': error_info.get('type'),
-            'description': error_info.get('message', '')[:100],
-            'success': fixed
-        })
-        self._save_state()
+        self._record_attempt(error_info, fixed)
         
         if reason:
             insights.append(f"Note: {reason}")
@@ -315,71 +454,86 @@ class MedicExecutor(AgentExecutor):
         if not file_ref:
             return None
         
+        if file_ref in self._locate_cache:
+            return self._locate_cache[file_ref]
+        
         # Try direct path
         direct = self.workspace / file_ref
         if direct.exists():
-            return direct
-        
-        # Try searching
-        file_name = Path(file_ref).name
-        matches = list(self.workspace.rglob(file_name))
-        
-        # Filter out node_modules, etc.
-        matches = [m for m in matches if 'node_modules' not in str(m)]
-        
-        if matches:
-            return matches[0]
+            found = direct
+        else:
+            # Fall back to the basename index, walking further only on a miss
+            file_name = Path(file_ref).name
+            known = self._file_index.get(file_name)
+            if known:
+                found = known[0]
+            else:
+                found = next((p for name, p in self._file_walker if name == file_name), None)
         
-        return None
+        self._locate_cache[file_ref] = found
+        return found
 
-    def _fix_missing_import(self, content: str, error_info: Dict) -> Optional[str]:
-        """Try to fix missing import"""
+    def _reset_file_lookup(self) -> None:
+        """Drop cached file lookups and restart the lazy workspace walk"""
+        self._file_index: Dict[str, List[Path]] = {}
+        self._locate_cache: Dict[str, Optional[Path]] = {}
+        self._file_walker = self._walk_workspace_files()
+
+    def _walk_workspace_files(self):
+        """Lazily walk the workspace, indexing files by basename as they are seen"""
+        for root, dirs, files in os.walk(self.workspace):
+            # Prune in place so os.walk never descends into these
+            dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
+            for name in files:
+                path = Path(root) / name
+                self._file_index.setdefault(name, []).append(path)
+                yield name, path
+
+    @staticmethod
+    def _split_eol(line: str) -> Tuple[str, str]:
+        """Split a keepends line into (body, line ending)"""
+        body = line.rstrip('\r\n')
+        return body, line[len(body):]
+
+    def _fix_missing_import(self, lines: List[str], content: str, error_info: Dict) -> bool:
+        """Try to fix missing import (edits lines in place)"""
         message = error_info.get('message', '')
         
         # Extract what's missing
-        match = re.search(r"['\"](\w+)['\"].*(?:not defined|cannot find)", message, re.IGNORECASE)
+        match = _MISSING_RE.search(message)
         if match:
             missing = match.group(1)
             
-            # Common auto-imports
-            auto_imports = {
-                'useState': "import { useState } from 'react';",
-                'useEffect': "import { useEffect } from 'react';",
-                'useCallback': "import { useCallback } from 'react';",
-                'useMemo': "import { useMemo } from 'react';",
-                'React': "import React from 'react';",
-                'Path': "from pathlib import Path",
-                'Dict': "from typing import Dict",
-                'List': "from typing import List",
-                'Optional': "from typing import Optional",
-            }
-            
-            if missing in auto_imports:
-                import_line = auto_imports[missing]
+            if missing in _AUTO_IMPORTS:
+                import_line = _AUTO_IMPORTS[missing]
                 if import_line not in content:
-                    # Add import at the top
-                    lines = content.split('\n')
                     # Find first non-comment, non-empty line
                     insert_pos = 0
                     for i, line in enumerate(lines):
-                        if line.strip() and not line.strip().startswith(('#', '//', '/*', '*')):
-                            if 'import' in line or 'from' in line:
-                                insert_pos = i + 1
-                            else:
-                                insert_pos = i
-                                break
+                        stripped = line.lstrip()
+                        if not stripped or stripped.startswith(('#', '//', '/*', '*')):
+                            continue
+                        if stripped.startswith(('import', 'from')):
+                            insert_pos = i + 1
+                            continue
+                        insert_pos = i
+                        break
                     
-                    lines.insert(insert_pos, import_line)
-                    return '\n'.join(lines)
+                    # Add import at the top, matching the file's line endings
+                    eol = self._split_eol(lines[0])[1] if lines else ''
+                    eol = eol or '\n'
+                    if insert_pos == len(lines) and lines and not self._split_eol(lines[-1])[1]:
+                        lines[-1] += eol
+                    lines.insert(insert_pos, import_line + eol)
+                    return True
         
-        return None
+        return False
 
-    def _fix_type_error(self, content: str, error_info: Dict) -> Optional[str]:
-        """Try to fix type errors"""
+    def _fix_type_error(self, lines: List[str], error_info: Dict) -> bool:
+        """Try to fix type errors (edits lines in place)"""
         line_num = error_info.get('line')
         
         if line_num:
-            lines = content.split('\n')
             if 0 < line_num <= len(lines):
                 line = lines[line_num - 1]
                 
@@ -388,88 +542,54 @@ class MedicExecutor(AgentExecutor):
                     # This is a simplified fix - in reality would need more analysis
                     pass
         
-        return None
+        return False
 
-    def _fix_syntax_error(self, content: str, error_info: Dict) -> Optional[str]:
-        """Try to fix common syntax errors"""
+    def _fix_syntax_error(self, lines: List[str], error_info: Dict, message: str) -> bool:
+        """Try to fix common syntax errors (edits lines in place; message is pre-lowered)"""
         line_num = error_info.get('line')
-        message = error_info.get('message', '').lower()
         
         if line_num:
-            lines = content.split('\n')
             if 0 < line_num <= len(lines):
-                line = lines[line_num - 1]
+                line, eol = self._split_eol(lines[line_num - 1])
                 
                 # Missing semicolon
                 if 'semicolon' in message and not line.rstrip().endswith(';'):
-                    lines[line_num - 1] = line.rstrip() + ';'
-                    return '\n'.join(lines)
+                    lines[line_num - 1] = line.rstrip() + ';' + eol
+                    return True
                 
                 # Unclosed bracket
                 if 'bracket' in message or 'brace' in message:
-                    open_count = line.count('(') + line.count('{') + line.count('[')
-                    close_count = line.count(')') + line.count('}') + line.count(']')
+                    counts = Counter(line)
+                    open_count = counts['('] + counts['{'] + counts['[']
+                    close_count = counts[')'] + counts['}'] + counts[']']
                     if open_count > close_count:
                         # Try to close
-                        if line.count('(') > line.count(')'):
-                            lines[line_num - 1] = line.rstrip() + ')'
-                            return '\n'.join(lines)
+                        if counts['('] > counts[')']:
+                            lines[line_num - 1] = line.rstrip() + ')' + eol
+                            return True
         
-        return None
+        return False
 
     def _build_fix_prompt(self, error_info: Dict, context: Dict) -> str:
         """Build prompt for ReasoningEngine fix"""
-        return f"""# Bug Fix Request
-
-## Error Information
-- **Type:** {error_info.get('type', 'unknown')}
-- **Message:** {error_info.get('message', 'No message')}
-- **File:** {error_info.get('file', 'Unknown')}
-- **Line:** {error_info.get('line', 'Unknown')}
-
-## Safety Rules (CRITICAL)
-1. DO NOT delete any files
-2. DO NOT replace more than {self.max_lines_per_fix} lines
-3. DO NOT modify more than {self.max_files_per_fix} files
-4. Always read the file BEFORE making changes
-5. Make the SMALLEST possible fix
-
-## Instructions
-1. Read the error file
-2. Identify the root cause
-3. Apply a minimal, surgical fix
-4. Verify the fix doesn't break other code
-
-Report what you fixed and why."""
+        return _FIX_PROMPT_TEMPLATE.format_map({
+            'type': error_info.get('type', 'unknown'),
+            'message': error_info.get('message', 'No message'),
+            'file': error_info.get('file', 'Unknown'),
+            'line': error_info.get('line', 'Unknown'),
+            'max_lines': self.max_lines_per_fix,
+            'max_files': self.max_files_per_fix,
+        })
 
     def _generate_medic_report(self, error_info: Dict, insights: List[str], fixed: bool) -> str:
         """Generate medic report"""
-        lines = [
-            "# Medic Report",
-            "",
-            "## Error Analyzed",
-            f"- **Type:** {error_info.get('type', 'unknown')}",
-            f"- **File:** {error_info.get('file', 'unknown')}",
-            f"- **Line:** {error_info.get('line', 'unknown')}",
-            f"- **Message:** {error_info.get('message', 'No message')[:200]}",
-            "",
-            "## Actions Taken",
-            ""
-        ]
-        
-        for insight in insights:
-            lines.append(f"- {insight}")
-        
-        lines.extend([
-            "",
-            "## Result",
-            "",
-            "✅ **Fix Applied**" if fixed else "⚠️ **Manual Review Required**",
-            "",
-            "## Next Steps",
-            "",
-            "- Run Agent 04 (Reviewer) to verify the fix" if fixed else "- Review error manually",
-            "- Run Agent 09 (Testing) to ensure no regressions" if fixed else "- Provide more error context"
-        ])
-        
-        return "\n".join(lines)
+        return _MEDIC_REPORT_TEMPLATE.format_map({
+            'type': error_info.get('type', 'unknown'),
+            'file': error_info.get('file', 'unknown'),
+            'line': error_info.get('line', 'unknown'),
+            'message': error_info.get('message', 'No message')[:200],
+            'actions': "".join(f"- {insight}\n" for insight in insights),
+            'result': "✅ **Fix Applied**" if fixed else "⚠️ **Manual Review Required**",
+            'next_review': "- Run Agent 04 (Reviewer) to verify the fix" if fixed else "- Review error manually",
+            'next_testing': "- Run Agent 09 (Testing) to ensure no regressions" if fixed else "- Provide more error context",
+        })
@@ -7,9 +7,32 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from core.agent_executor import AgentExecutor, AgentResult, Artifact
 import subprocess
+import io
 import json
 import os
 import platform
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Toolchain version probes, shared across executor instances:
+# (command, cwd) -> (timestamp, output). Versions rarely change within a
+# session; cwd is part of the key because version-manager shims (pyenv, nvm,
+# volta, asdf) pick the toolchain per directory. Only successful probes are
+# stored; a failure is retried on the next call.
+_VERSION_CACHE: Dict[Tuple[Tuple[str, ...], str], Tuple[float, str]] = {}
+_VERSION_CACHE_TTL = 300  # seconds
+
+# Tool name -> resolved executable path. Misses are not stored, so a tool
+# installed after a "missing" report is found on the next run.
+_WHICH_CACHE: Dict[str, str] = {}
+
+
+def _has_package_key(data: bytes, name: bytes) -> bool:
+    """Check raw package.json bytes for a `"name":` key (e.g. a dependency)"""
+    return re.search(b'"' + re.escape(name) + rb'"\s*:', data) is not None
 
 
 class OperatorExecutor(AgentExecutor):
@@ -23,9 +46,15 @@ class OperatorExecutor(AgentExecutor):
         self.node_indicators = ['package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml']
         self.python_indicators = ['requirements.txt', 'pyproject.toml', 'Pipfile', 'setup.py']
         self.docker_indicators = ['Dockerfile', 'docker-compose.yml', 'docker-compose.yaml']
+        
+        # Top-level workspace entry names, read on first use and once per execute()
+        self._root_names_cache: Optional[set] = None
 
     def execute(self, query: str, context: Dict, **kwargs) -> AgentResult:
         """Execute runtime setup and management"""
+        # One directory read answers every top-level existence check below
+        self._root_names_cache = None
+        
         # Detect project type
         project_info = self._detect_project_type()
         
@@ -41,6 +70,21 @@ class OperatorExecutor(AgentExecutor):
         else:
             return self._report_requirements(project_info, toolchain_status, env_status)
 
+    @property
+    def _root_names(self) -> set:
+        """Workspace entry names; scanned lazily, reset at the start of execute()"""
+        if self._root_names_cache is None:
+            self._root_names_cache = self._scan_root()
+        return self._root_names_cache
+
+    def _scan_root(self) -> set:
+        """Names of files and directories directly inside the workspace"""
+        try:
+            with os.scandir(self.workspace) as entries:
+                return {entry.name for entry in entries}
+        except OSError:
+            return set()
+
     def _detect_project_type(self) -> Dict:
         """Detect project type from workspace files"""
         info = {
@@ -54,34 +98,34 @@ class OperatorExecutor(AgentExecutor):
         
         # Check for Node.js project
         package_json = self.workspace / 'package.json'
-        if package_json.exists():
+        if 'package.json' in self._root_names:
             info['type'] = 'node'
             try:
-                pkg = json.loads(package_json.read_text(encoding='utf-8'))
+                data = package_json.read_bytes()
                 
-                # Detect framework
-                deps = {**pkg.get('dependencies', {}), **pkg.get('devDependencies', {})}
-                if 'next' in deps:
+                # Detect framework by probing for dependency keys in the raw
+                # bytes; only parse the JSON when scripts.start is needed
+                if _has_package_key(data, b'next'):
                     info['framework'] = 'nextjs'
                     info['start_command'] = 'npm run dev'
-                elif 'vite' in deps:
+                elif _has_package_key(data, b'vite'):
                     info['framework'] = 'vite'
                     info['start_command'] = 'npm run dev'
-                elif 'express' in deps:
+                elif _has_package_key(data, b'express'):
                     info['framework'] = 'express'
-                    info['start_command'] = pkg.get('scripts', {}).get('start', 'node server.js')
-                elif 'react' in deps:
+                    info['start_command'] = json.loads(data).get('scripts', {}).get('start', 'node server.js')
+                elif _has_package_key(data, b'react'):
                     info['framework'] = 'react'
                     info['start_command'] = 'npm start'
                 else:
-                    info['start_command'] = pkg.get('scripts', {}).get('start', 'npm start')
+                    info['start_command'] = json.loads(data).get('scripts', {}).get('start', 'npm start')
                 
                 # Detect package manager from lockfile
-                if (self.workspace / 'pnpm-lock.yaml').exists():
+                if 'pnpm-lock.yaml' in self._root_names:
                     info['package_manager'] = 'pnpm'
-                elif (self.workspace / 'yarn.lock').exists():
+                elif 'yarn.lock' in self._root_names:
                     info['package_manager'] = 'yarn'
-                elif (self.workspace / 'bun.lockb').exists():
+                elif 'bun.lockb' in self._root_names:
                     info['package_manager'] = 'bun'
                 else:
                     info['package_manager'] = 'npm'
@@ -91,13 +135,13 @@ class OperatorExecutor(AgentExecutor):
                 info['start_command'] = 'npm start'
         
         # Check for Python project
-        elif (self.workspace / 'requirements.txt').exists() or (self.workspace / 'pyproject.toml').exists():
+        elif 'requirements.txt' in self._root_names or 'pyproject.toml' in self._root_names:
             info['type'] = 'python'
             info['package_manager'] = 'pip'
             
             # Detect framework
             req_file = self.workspace / 'requirements.txt'
-            if req_file.exists():
+            if 'requirements.txt' in self._root_names:
                 reqs = req_file.read_text(encoding='utf-8', errors='ignore').lower()
                 if 'fastapi' in reqs or 'uvicorn' in reqs:
                     info['framework'] = 'fastapi'
@@ -115,7 +159,7 @@ class OperatorExecutor(AgentExecutor):
                     info['start_command'] = 'python main.py'
         
         # Check for Docker
-        elif (self.workspace / 'docker-compose.yml').exists():
+        elif 'docker-compose.yml' in self._root_names:
             info['type'] = 'docker'
             info['start_command'] = 'docker-compose up'
         
@@ -125,76 +169,58 @@ class OperatorExecutor(AgentExecutor):
         """Verify required tools are installed"""
         status = {'ready': True, 'missing': [], 'versions': {}}
         
+        # (version key, argv, required) per project type
         if project_info['type'] == 'node':
-            # Check Node.js
-            node_version = self._run_command('node --version')
-            if node_version:
-                status['versions']['node'] = node_version.strip()
-            else:
-                status['ready'] = False
-                status['missing'].append('node')
-            
-            # Check package manager
             pm = project_info['package_manager']
-            pm_version = self._run_command(f'{pm} --version')
-            if pm_version:
-                status['versions'][pm] = pm_version.strip()
-            else:
-                status['ready'] = False
-                status['missing'].append(pm)
-        
+            probes = [('node', ['node', '--version'], True),
+                      (pm, [pm, '--version'], True)]
         elif project_info['type'] == 'python':
-            # Check Python
             python_cmd = 'python' if self.system == 'Windows' else 'python3'
-            python_version = self._run_command(f'{python_cmd} --version')
-            if python_version:
-                status['versions']['python'] = python_version.strip()
-            else:
-                status['ready'] = False
-                status['missing'].append('python')
-            
-            # Check pip
-            pip_version = self._run_command(f'{python_cmd} -m pip --version')
-            if pip_version:
-                status['versions']['pip'] = pip_version.split()[1] if pip_version else 'unknown'
-            else:
-                status['missing'].append('pip')
-        
+            probes = [('python', [python_cmd, '--version'], True),
+                      ('pip', [python_cmd, '-m', 'pip', '--version'], False)]
         elif project_info['type'] == 'docker':
-            # Check Docker
-            docker_version = self._run_command('docker --version')
-            if docker_version:
-                status['versions']['docker'] = docker_version.strip()
+            probes = [('docker', ['docker', '--version'], True)]
+        else:
+            probes = []
+        
+        outputs = self._probe_versions([argv for _, argv, _ in probes])
+        for (name, _, required), output in zip(probes, outputs):
+            if output:
+                # `pip --version` prints "pip X.Y from ..."; keep just the version
+                status['versions'][name] = output.split()[1] if name == 'pip' else output.strip()
             else:
-                status['ready'] = False
-                status['missing'].append('docker')
+                if required:
+                    status['ready'] = False
+                status['missing'].append(name)
         
         return status
 
+    def _probe_versions(self, argvs: List[List[str]]) -> List[Optional[str]]:
+        """Run version probes concurrently so their spawn latencies overlap"""
+        if len(argvs) < 2:
+            return [self._run_command(argv, cacheable=True) for argv in argvs]
+        with ThreadPoolExecutor(max_workers=len(argvs)) as pool:
+            return list(pool.map(lambda argv: self._run_command(argv, cacheable=True), argvs))
+
     def _check_environment(self, project_info: Dict) -> Dict:
         """Check environment configuration"""
         status = {'ready': True, 'missing': [], 'warnings': []}
         
         # Check for .env files
-        env_file = self.workspace / '.env'
-        env_example = self.workspace / '.env.example'
-        env_local = self.workspace / '.env.local'
-        
-        if env_example.exists() and not env_file.exists() and not env_local.exists():
+        names = self._root_names
+        if '.env.example' in names and '.env' not in names and '.env.local' not in names:
             status['ready'] = False
             status['missing'].append('.env file (copy from .env.example)')
         
         # Check for node_modules (Node.js)
         if project_info['type'] == 'node':
-            node_modules = self.workspace / 'node_modules'
-            if not node_modules.exists():
+            if 'node_modules' not in self._root_names:
                 status['ready'] = False
                 status['missing'].append('node_modules (run npm install)')
         
         # Check for venv (Python)
         elif project_info['type'] == 'python':
-            venv = self.workspace / 'venv'
-            if not venv.exists() and not os.environ.get('VIRTUAL_ENV'):
+            if 'venv' not in self._root_names and not os.environ.get('VIRTUAL_ENV'):
                 status['warnings'].append('No virtual environment detected')
         
         return status
@@ -206,10 +232,9 @@ class OperatorExecutor(AgentExecutor):
         
         # Install dependencies if needed
         if project_info['type'] == 'node':
-            node_modules = self.workspace / 'node_modules'
-            if not node_modules.exists():
+            if 'node_modules' not in self._root_names:
                 pm = project_info['package_manager']
-                install_result = self._run_command(f'{pm} install', cwd=str(self.workspace))
+                install_result = self._run_command([pm, 'install'], cwd=str(self.workspace))
                 if install_result:
                     insights.append(f"Dependencies installed with {pm}")
                 else:
@@ -224,11 +249,10 @@ class OperatorExecutor(AgentExecutor):
         
         elif project_info['type'] == 'python':
             # Install requirements
-            req_file = self.workspace / 'requirements.txt'
-            if req_file.exists():
+            if 'requirements.txt' in self._root_names:
                 python_cmd = 'python' if self.system == 'Windows' else 'python3'
                 install_result = self._run_command(
-                    f'{python_cmd} -m pip install -r requirements.txt',
+                    [python_cmd, '-m', 'pip', 'install', '-r', 'requirements.txt'],
                     cwd=str(self.workspace)
                 )
                 if install_result:
@@ -287,97 +311,107 @@ class OperatorExecutor(AgentExecutor):
             confidence=0.5
         )
 
-    def _run_command(self, command: str, cwd: str = None, timeout: int = 60) -> Optional[str]:
-        """Run a shell command and return output"""
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=cwd or str(self.workspace),
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            return result.stdout if result.returncode == 0 else None
-        except Exception:
-            return None
+    @staticmethod
+    def _which(tool: str) -> Optional[str]:
+        """Resolve a tool on PATH once found (also finds .cmd/.exe shims on Windows)"""
+        path = _WHICH_CACHE.get(tool)
+        if path is None:
+            path = shutil.which(tool)
+            if path is not None:
+                _WHICH_CACHE[tool] = path
+        return path
+
+    def _run_command(self, argv: List[str], cwd: str = None, timeout: int = 60,
+                     cacheable: bool = False) -> Optional[str]:
+        """Run a command (argv list, no shell) and return output.
+        
+        Returns None without spawning anything if the tool is not on PATH.
+        cacheable=True reuses a successful result for up to _VERSION_CACHE_TTL
+        seconds; only use it for side-effect-free probes such as `node --version`.
+        """
+        cwd = cwd or str(self.workspace)
+        key = (tuple(argv), cwd)
+        if cacheable:
+            cached = _VERSION_CACHE.get(key)
+            if cached and time.monotonic() - cached[0] < _VERSION_CACHE_TTL:
+                return cached[1]
+        
+        executable = self._which(argv[0])
+        output = None
+        if executable:
+            try:
+                result = subprocess.run(
+                    [executable, *argv[1:]],
+                    cwd=cwd,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+                output = result.stdout if result.returncode == 0 else None
+            except Exception:
+                output = None
+        
+        if cacheable and output is not None:
+            _VERSION_CACHE[key] = (time.monotonic(), output)
+        return output
 
     def _generate_run_instructions(self, project_info: Dict) -> str:
         """Generate runtime instructions"""
-        lines = [
-            "# Runtime Setup Complete",
-            "",
-            "## Project Information",
-            f"- **Type:** {project_info['type']}",
-            f"- **Framework:** {project_info['framework'] or 'N/A'}",
-            f"- **Package Manager:** {project_info['package_manager'] or 'N/A'}",
-            "",
-            "## Start the Application",
-            "",
-            "```bash",
-            f"cd {self.workspace}",
-            f"{project_info['start_command']}",
-            "```",
-            "",
-            f"The application should be available at: **http://localhost:{project_info['port']}**",
-            "",
-            "## Next Steps",
-            "- Run the application with the command above",
-            "- Verify the application loads correctly",
-            "- Proceed to Agent 09 (Testing) for automated tests"
-        ]
-        
-        return "\n".join(lines)
+        buf = io.StringIO()
+        w = buf.write
+        w("# Runtime Setup Complete\n\n")
+        w("## Project Information\n")
+        w(f"- **Type:** {project_info['type']}\n")
+        w(f"- **Framework:** {project_info['framework'] or 'N/A'}\n")
+        w(f"- **Package Manager:** {project_info['package_manager'] or 'N/A'}\n\n")
+        w("## Start the Application\n\n")
+        w("```bash\n")
+        w(f"cd {self.workspace}\n")
+        w(f"{project_info['start_command']}\n")
+        w("```\n\n")
+        w(f"The application should be available at: **http://localhost:{project_info['port']}**\n\n")
+        w("## Next Steps\n")
+        w("- Run the application with the command above\n")
+        w("- Verify the application loads correctly\n")
+        w("- Proceed to Agent 09 (Testing) for automated tests")
+        
+        return buf.getvalue()
 
     def _generate_setup_guide(self, project_info: Dict, toolchain: Dict, env: Dict) -> str:
         """Generate setup guide for missing requirements"""
-        lines = [
-            "# Setup Requirements",
-            "",
-            "The following items need to be set up before running the application:",
-            ""
-        ]
+        buf = io.StringIO()
+        w = buf.write
+        w("# Setup Requirements\n\n")
+        w("The following items need to be set up before running the application:\n\n")
         
         if toolchain['missing']:
-            lines.extend([
-                "## Missing Tools",
-                ""
-            ])
+            w("## Missing Tools\n\n")
             for tool in toolchain['missing']:
                 if tool == 'node':
-                    lines.append(f"- **Node.js**: Download from https://nodejs.org/")
+                    w("- **Node.js**: Download from https://nodejs.org/\n")
                 elif tool == 'npm':
-                    lines.append(f"- **npm**: Comes with Node.js")
+                    w("- **npm**: Comes with Node.js\n")
                 elif tool == 'python':
-                    lines.append(f"- **Python**: Download from https://python.org/")
+                    w("- **Python**: Download from https://python.org/\n")
                 elif tool == 'docker':
-                    lines.append(f"- **Docker**: Download from https://docker.com/")
+                    w("- **Docker**: Download from https://docker.com/\n")
                 else:
-                    lines.append(f"- **{tool}**: Please install")
-            lines.append("")
+                    w(f"- **{tool}**: Please install\n")
+            w("\n")
         
         if env['missing']:
-            lines.extend([
-                "## Missing Environment",
-                ""
-            ])
+            w("## Missing Environment\n\n")
             for item in env['missing']:
-                lines.append(f"- {item}")
-            lines.append("")
+                w(f"- {item}\n")
+            w("\n")
         
         if toolchain.get('versions'):
-            lines.extend([
-                "## Detected Versions",
-                ""
-            ])
+            w("## Detected Versions\n\n")
             for tool, version in toolchain['versions'].items():
-                lines.append(f"- **{tool}**: {version}")
-            lines.append("")
+                w(f"- **{tool}**: {version}\n")
+            w("\n")
         
-        lines.extend([
-            "## After Setup",
-            "",
-            "Run Agent 06 again to verify setup and start the application."
-        ])
+        w("## After Setup\n\n")
+        w("Run Agent 06 again to verify setup and start the application.")
         
-        return "\n".join(lines)
+        return buf.getvalue()
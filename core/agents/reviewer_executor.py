@@ -4,9 +4,110 @@ Agent 04: Code Review and Security Analysis via ReasoningEngine
 """
 
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from core.agent_executor import AgentExecutor, AgentResult, Artifact
+import io
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.py', '.java', '.go', '.rs')
+EXCLUDED_DIRS = frozenset({
+    'node_modules', '.next', 'dist', 'build', '__pycache__', '.git',
+    'venv', '.venv', 'env', '.tox', '.eggs', 'coverage',
+})
+# Bundled/minified outputs: single huge lines that are slow to regex and not worth reviewing
+GENERATED_SUFFIXES = ('.min.js', '.min.css', '.bundle.js')
+# Only the head of very large files is scanned; the tail is usually generated data
+MAX_REVIEW_BYTES = 512 * 1024
+
+# Security patterns: name -> (regex, message, severity). The names become
+# regex group names so one alternation scan can classify every hit.
+_SECURITY_PATTERNS = {
+    # Critical patterns
+    'hardcoded_password': (r'password\s*=\s*["\'][^"\']+["\']', 'Hardcoded password detected', 'critical'),
+    'hardcoded_api_key': (r'api[_-]?key\s*=\s*["\'][^"\']+["\']', 'Hardcoded API key detected', 'critical'),
+    'hardcoded_secret': (r'secret\s*=\s*["\'][^"\']+["\']', 'Hardcoded secret detected', 'critical'),
+    'eval': (r'eval\s*\(', 'Use of eval() is dangerous', 'critical'),
+    'exec': (r'exec\s*\(', 'Use of exec() is dangerous', 'critical'),
+    'sql_injection': (r'\$\{.*\}.*query|query.*\$\{', 'Possible SQL injection', 'critical'),
+    
+    # Warning patterns
+    'console_log': (r'console\.log', 'Console.log should be removed in production', 'warning'),
+    'debugger': (r'debugger', 'Debugger statement found', 'warning'),
+    'todo': (r'TODO|FIXME|HACK', 'Unresolved TODO/FIXME comment', 'info'),
+    'any_type': (r'any\s*[;,\)]', 'TypeScript any type usage', 'warning'),
+    'inner_html': (r'innerHTML\s*=', 'innerHTML can lead to XSS', 'warning'),
+    'dangerous_html': (r'dangerouslySetInnerHTML', 'dangerouslySetInnerHTML is risky', 'warning'),
+}
+# Each alternative is a zero-width lookahead, so a hit for one pattern does
+# not consume text another pattern would match (dangerouslySetInnerHTML=
+# is also an innerHTML assignment; sql_injection's `.*` spans the line)
+_SECURITY_RE = re.compile(
+    '|'.join(f'(?=(?P<{name}>{pattern}))' for name, (pattern, _, _) in _SECURITY_PATTERNS.items()).encode(),
+    re.IGNORECASE
+)
+# Per-pattern regexes for the rare same-position ties the alternation can
+# only report one of
+_SECURITY_PATTERN_RES = {
+    name: re.compile(pattern.encode(), re.IGNORECASE)
+    for name, (pattern, _, _) in _SECURITY_PATTERNS.items()
+}
+
+# Lowercase literals, one of which every match of the pattern must contain
+_SECURITY_PATTERN_LITERALS = {
+    'hardcoded_password': (b'password',),
+    'hardcoded_api_key': (b'key',),
+    'hardcoded_secret': (b'secret',),
+    'eval': (b'eval',),
+    'exec': (b'exec',),
+    'sql_injection': (b'query',),
+    'console_log': (b'console.log',),
+    'debugger': (b'debugger',),
+    'todo': (b'todo', b'fixme', b'hack'),
+    'any_type': (b'any',),
+    'inner_html': (b'innerhtml',),
+    'dangerous_html': (b'dangerouslysetinnerhtml',),
+}
+_SECURITY_LITERALS = tuple(sorted({
+    literal for literals in _SECURITY_PATTERN_LITERALS.values() for literal in literals
+}))
+
+# Quality / performance patterns
+_EMPTY_CATCH_RE = re.compile(rb'catch\s*\([^)]*\)\s*\{\s*\}')
+_N_PLUS_ONE_RE = re.compile(rb'for.*await.*find|forEach.*await')
+
+# Per-file review results keyed by (workspace, path) ->
+# (st_mtime_ns, st_size, full_review, scanned_at_ns, result), valid while the
+# file's (st_mtime_ns, st_size) is unchanged. Executors are created per invocation,
+# so this lives at module level to survive review -> fix -> review loops.
+_ISSUE_CACHE: Dict[Tuple[str, str], Tuple[int, int, bool, int, Tuple[List[Tuple[str, str, str]], ...]]] = {}
+_ISSUE_CACHE_MAX = 4096
+# Files modified this close to their last scan are re-read: a same-size
+# rewrite within one mtime tick (e.g. a Medic fix right after a review)
+# would otherwise look unchanged
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _count_at_least(data: bytes, needle: bytes, limit: int) -> bool:
+    """True once needle occurs limit times; stops scanning at that point"""
+    pos = -1
+    for _ in range(limit):
+        pos = data.find(needle, pos + 1)
+        if pos < 0:
+            return False
+    return True
+
+
+def _bucket_by_severity(issues: List[Tuple[str, str, str]]) -> Tuple[List[Tuple[str, str, str]], ...]:
+    """Split issues into (critical, warning, info) in one pass"""
+    critical, warnings, info = [], [], []
+    buckets = {'critical': critical, 'warning': warnings}
+    for issue in issues:
+        buckets.get(issue[1], info).append(issue)
+    return critical, warnings, info
 
 
 class ReviewerExecutor(AgentExecutor):
@@ -21,6 +122,9 @@ class ReviewerExecutor(AgentExecutor):
                 self.reasoning_engine = ReasoningEngine(workspace, ai_provider)
             except ImportError:
                 pass
+        
+        # Per-file scans are I/O plus C-level regex work; overlap them on threads
+        self.max_scan_workers = 8
 
     def execute(self, query: str, context: Dict, **kwargs) -> AgentResult:
         """Execute code review"""
@@ -73,21 +177,16 @@ class ReviewerExecutor(AgentExecutor):
         # Scan source files
         source_files = self._get_source_files()
         
-        # Run security checks
-        security_issues = self._security_review(source_files)
+        # Run security, code quality and performance checks (one read per file)
+        security_issues, quality_issues, perf_issues = self._review_files(source_files)
         issues.extend(security_issues)
-        
-        # Run code quality checks
-        quality_issues = self._quality_review(source_files)
         issues.extend(quality_issues)
-        
-        # Run performance checks
-        perf_issues = self._performance_review(source_files)
         issues.extend(perf_issues)
 
-        # Determine status based on issues
-        critical_count = sum(1 for _, severity, _ in issues if severity == 'critical')
-        warning_count = sum(1 for _, severity, _ in issues if severity == 'warning')
+        # Determine status based on issues (classified once, reused by the report)
+        by_severity = _bucket_by_severity(issues)
+        critical_count = len(by_severity[0])
+        warning_count = len(by_severity[1])
         
         if critical_count > 0:
             status = "failed"
@@ -104,7 +203,7 @@ class ReviewerExecutor(AgentExecutor):
         if reason:
             insights.append(f"Note: {reason}")
 
-        report = self._generate_review_report(source_files, issues)
+        report = self._generate_review_report(source_files, issues, by_severity)
 
         return AgentResult(
             agent_id="04",
@@ -162,162 +261,192 @@ You are a Principal Staff Engineer reviewing this code. Check:
 
 Generate a detailed review report with severity levels."""
 
-    def _get_source_files(self) -> List[Path]:
-        """Get source files to review"""
-        extensions = ['.ts', '.tsx', '.js', '.jsx', '.py', '.java', '.go', '.rs']
+    def _get_source_files(self) -> List[str]:
+        """Get source files to review (single pruned walk, capped at 100)"""
         source_files = []
+        stack = [str(self.workspace)]
         
-        for ext in extensions:
-            source_files.extend(self.workspace.rglob(f'*{ext}'))
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Prune non-source directories without descending
+                            if entry.name not in EXCLUDED_DIRS:
+                                stack.append(entry.path)
+                        elif (entry.name.endswith(SOURCE_EXTENSIONS)
+                              and not entry.name.endswith(GENERATED_SUFFIXES)):
+                            source_files.append(entry.path)
+                            if len(source_files) >= 100:  # Limit for performance
+                                return source_files
+            except OSError:
+                continue
         
-        # Filter out non-source directories
-        excluded = ['node_modules', '.next', 'dist', 'build', '__pycache__', '.git', 'venv']
-        source_files = [f for f in source_files 
-                        if not any(ex in str(f) for ex in excluded)]
+        return source_files
+
+    def _review_files(self, files: List[str]) -> Tuple[List[Tuple[str, str, str]], ...]:
+        """Review files on a thread pool; returns (security, quality, performance) issues"""
+        # Security covers the first 50 files, quality/performance the first 30
+        targets = files[:50]
+        full_review = [i < 30 for i in range(len(targets))]
         
-        return source_files[:100]  # Limit for performance
+        security, quality, performance = [], [], []
+        with ThreadPoolExecutor(max_workers=self.max_scan_workers) as pool:
+            for sec, qual, perf in pool.map(self._review_file, targets, full_review):
+                security.extend(sec)
+                quality.extend(qual)
+                performance.extend(perf)
+        return security, quality, performance
 
-    def _security_review(self, files: List[Path]) -> List[Tuple[str, str, str]]:
+    def _review_file(self, file_path: str, full_review: bool) -> Tuple[List[Tuple[str, str, str]], ...]:
+        """Review one file, reusing the cached result while it is unchanged"""
+        try:
+            st = os.stat(file_path)
+            key = (str(self.workspace), file_path)
+            cached = _ISSUE_CACHE.get(key)
+            if (cached and cached[:2] == (st.st_mtime_ns, st.st_size)
+                    and (cached[2] or not full_review)
+                    and st.st_mtime_ns < cached[3] - _RACY_WINDOW_NS):
+                result = cached[4]
+                return result if full_review else (result[0], [], [])
+            
+            scanned_at = time.time_ns()
+            result = self._scan_file(file_path, full_review)
+            if len(_ISSUE_CACHE) >= _ISSUE_CACHE_MAX:
+                _ISSUE_CACHE.clear()
+            _ISSUE_CACHE[key] = (st.st_mtime_ns, st.st_size, full_review, scanned_at, result)
+            return result
+        except Exception:
+            return [], [], []
+
+    def _scan_file(self, file_path: str, full_review: bool) -> Tuple[List[Tuple[str, str, str]], ...]:
+        """Run the checks on the file contents (uncached)"""
+        with open(file_path, 'rb') as f:
+            data = f.read(MAX_REVIEW_BYTES + 1)
+        truncated = len(data) > MAX_REVIEW_BYTES
+        if truncated:
+            data = data[:MAX_REVIEW_BYTES]
+        # Large file with almost no newlines near the top: minified, skip it
+        if len(data) > 65536 and data[:4096].count(b'\n') < 3:
+            return [], [], []
+        relative_path = os.path.relpath(file_path, self.workspace)
+        
+        security = self._security_checks(data, relative_path)
+        if not full_review:
+            return security, [], []
+        quality = self._quality_checks(data, relative_path)
+        if truncated:
+            quality.append((f"{relative_path}: Only the first {MAX_REVIEW_BYTES // 1024}KB was reviewed",
+                            'info', 'truncated'))
+        return security, quality, self._performance_checks(file_path, data, relative_path)
+
+    def _security_checks(self, data: bytes, relative_path: str) -> List[Tuple[str, str, str]]:
         """Check for security vulnerabilities"""
         issues = []
         
-        security_patterns = {
-            # Critical patterns
-            r'password\s*=\s*["\'][^"\']+["\']': ('Hardcoded password detected', 'critical'),
-            r'api[_-]?key\s*=\s*["\'][^"\']+["\']': ('Hardcoded API key detected', 'critical'),
-            r'secret\s*=\s*["\'][^"\']+["\']': ('Hardcoded secret detected', 'critical'),
-            r'eval\s*\(': ('Use of eval() is dangerous', 'critical'),
-            r'exec\s*\(': ('Use of exec() is dangerous', 'critical'),
-            r'\$\{.*\}.*query|query.*\$\{': ('Possible SQL injection', 'critical'),
-            
-            # Warning patterns
-            r'console\.log': ('Console.log should be removed in production', 'warning'),
-            r'debugger': ('Debugger statement found', 'warning'),
-            r'TODO|FIXME|HACK': ('Unresolved TODO/FIXME comment', 'info'),
-            r'any\s*[;,\)]': ('TypeScript any type usage', 'warning'),
-            r'innerHTML\s*=': ('innerHTML can lead to XSS', 'warning'),
-            r'dangerouslySetInnerHTML': ('dangerouslySetInnerHTML is risky', 'warning'),
-        }
+        # Cheap prefilter: skip the regex when no pattern literal occurs
+        lowered = data.lower()
+        if not any(literal in lowered for literal in _SECURITY_LITERALS):
+            return issues
         
-        for file_path in files[:50]:
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                relative_path = str(file_path.relative_to(self.workspace))
-                
-                for pattern, (message, severity) in security_patterns.items():
-                    if re.search(pattern, content, re.IGNORECASE):
-                        issues.append((f"{relative_path}: {message}", severity, pattern))
-                        
-            except Exception:
-                pass
+        # One pass over the file finds nearly every pattern that occurs
+        seen = set()
+        for match in _SECURITY_RE.finditer(data):
+            seen.add(match.lastgroup)
+            if len(seen) == len(_SECURITY_PATTERNS):
+                break  # every pattern has fired; nothing left to find
+        
+        # Report each pattern at most once, in declaration order. A pattern
+        # the pass did not report is searched on its own only if its
+        # literal occurs, to catch hits that started at the same position
+        # as an earlier alternative's.
+        for name, (pattern, message, severity) in _SECURITY_PATTERNS.items():
+            if name not in seen:
+                if not any(literal in lowered for literal in _SECURITY_PATTERN_LITERALS[name]):
+                    continue
+                if not _SECURITY_PATTERN_RES[name].search(data):
+                    continue
+            issues.append((f"{relative_path}: {message}", severity, pattern))
         
         return issues
 
-    def _quality_review(self, files: List[Path]) -> List[Tuple[str, str, str]]:
+    def _quality_checks(self, data: bytes, relative_path: str) -> List[Tuple[str, str, str]]:
         """Check for code quality issues"""
         issues = []
+        line_count = data.count(b'\n') + 1
         
-        for file_path in files[:30]:
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                lines = content.split('\n')
-                relative_path = str(file_path.relative_to(self.workspace))
-                
-                # Check file length
-                if len(lines) > 500:
-                    issues.append((f"{relative_path}: File too long ({len(lines)} lines)", 'warning', 'file_length'))
-                
-                # Check function length (simplified)
-                if content.count('function') > 20:
-                    issues.append((f"{relative_path}: Too many functions, consider splitting", 'info', 'complexity'))
-                
-                # Check for empty catch blocks
-                if re.search(r'catch\s*\([^)]*\)\s*\{\s*\}', content):
-                    issues.append((f"{relative_path}: Empty catch block found", 'warning', 'error_handling'))
-                
-                # Check for missing error handling
-                if 'async' in content and 'catch' not in content and 'try' not in content:
-                    issues.append((f"{relative_path}: Async code without error handling", 'warning', 'error_handling'))
-                    
-            except Exception:
-                pass
+        # Check file length
+        if line_count > 500:
+            issues.append((f"{relative_path}: File too long ({line_count} lines)", 'warning', 'file_length'))
+        
+        # Check function length (simplified)
+        if _count_at_least(data, b'function', 21):
+            issues.append((f"{relative_path}: Too many functions, consider splitting", 'info', 'complexity'))
+        
+        # Check for empty catch blocks
+        has_catch = b'catch' in data
+        if has_catch and _EMPTY_CATCH_RE.search(data):
+            issues.append((f"{relative_path}: Empty catch block found", 'warning', 'error_handling'))
+        
+        # Check for missing error handling
+        if b'async' in data and not has_catch and b'try' not in data:
+            issues.append((f"{relative_path}: Async code without error handling", 'warning', 'error_handling'))
         
         return issues
 
-    def _performance_review(self, files: List[Path]) -> List[Tuple[str, str, str]]:
+    def _performance_checks(self, file_path: str, data: bytes, relative_path: str) -> List[Tuple[str, str, str]]:
         """Check for performance issues"""
         issues = []
         
-        for file_path in files[:30]:
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                relative_path = str(file_path.relative_to(self.workspace))
-                
-                # Check for N+1 query patterns
-                if re.search(r'for.*await.*find|forEach.*await', content):
-                    issues.append((f"{relative_path}: Possible N+1 query in loop", 'warning', 'n+1'))
-                
-                # Check for missing useCallback/useMemo in React
-                if '.tsx' in str(file_path) or '.jsx' in str(file_path):
-                    if 'onClick' in content and 'useCallback' not in content:
-                        issues.append((f"{relative_path}: Consider useCallback for event handlers", 'info', 'react_perf'))
-                
-                # Check for large imports
-                if "import * from" in content:
-                    issues.append((f"{relative_path}: Barrel import may increase bundle size", 'info', 'bundle'))
-                    
-            except Exception:
-                pass
+        # Check for N+1 query patterns
+        if _N_PLUS_ONE_RE.search(data):
+            issues.append((f"{relative_path}: Possible N+1 query in loop", 'warning', 'n+1'))
+        
+        # Check for missing useCallback/useMemo in React
+        if file_path.endswith(('.tsx', '.jsx')):
+            if b'onClick' in data and b'useCallback' not in data:
+                issues.append((f"{relative_path}: Consider useCallback for event handlers", 'info', 'react_perf'))
+        
+        # Check for large imports
+        if b"import * from" in data:
+            issues.append((f"{relative_path}: Barrel import may increase bundle size", 'info', 'bundle'))
         
         return issues
 
-    def _generate_review_report(self, files: List[Path], issues: List[Tuple[str, str, str]]) -> str:
+    def _generate_review_report(self, files: List[str], issues: List[Tuple[str, str, str]],
+                                by_severity: Optional[Tuple[List[Tuple[str, str, str]], ...]] = None) -> str:
         """Generate comprehensive review report"""
-        critical = [i for i in issues if i[1] == 'critical']
-        warnings = [i for i in issues if i[1] == 'warning']
-        info = [i for i in issues if i[1] == 'info']
+        critical, warnings, info = by_severity or _bucket_by_severity(issues)
         
-        report = [
-            "# Code Review Report",
-            "",
-            f"**Files Reviewed:** {len(files)}",
-            f"**Total Issues:** {len(issues)}",
-            "",
-            "## Summary",
-            f"- 🔴 Critical: {len(critical)}",
-            f"- 🟡 Warnings: {len(warnings)}",
-            f"- 🔵 Info: {len(info)}",
-            ""
-        ]
+        buf = io.StringIO()
+        w = buf.write
+        w("# Code Review Report\n\n")
+        w(f"**Files Reviewed:** {len(files)}\n")
+        w(f"**Total Issues:** {len(issues)}\n\n")
+        w("## Summary\n")
+        w(f"- 🔴 Critical: {len(critical)}\n")
+        w(f"- 🟡 Warnings: {len(warnings)}\n")
+        w(f"- 🔵 Info: {len(info)}\n\n")
         
         if critical:
-            report.extend([
-                "## 🔴 Critical Issues (Must Fix)",
-                ""
-            ])
+            w("## 🔴 Critical Issues (Must Fix)\n\n")
             for issue, _, _ in critical:
-                report.append(f"- {issue}")
-            report.append("")
+                w(f"- {issue}\n")
+            w("\n")
         
         if warnings:
-            report.extend([
-                "## 🟡 Warnings (Should Fix)",
-                ""
-            ])
+            w("## 🟡 Warnings (Should Fix)\n\n")
             for issue, _, _ in warnings[:15]:  # Limit displayed warnings
-                report.append(f"- {issue}")
+                w(f"- {issue}\n")
             if len(warnings) > 15:
-                report.append(f"- ... and {len(warnings) - 15} more warnings")
-            report.append("")
+                w(f"- ... and {len(warnings) - 15} more warnings\n")
+            w("\n")
         
         if info:
-            report.extend([
-                "## 🔵 Suggestions (Nice to Have)",
-                ""
-            ])
+            w("## 🔵 Suggestions (Nice to Have)\n\n")
             for issue, _, _ in info[:10]:
-                report.append(f"- {issue}")
-            report.append("")
+                w(f"- {issue}\n")
+            w("\n")
         
         # Verdict
         if critical:
@@ -330,12 +459,8 @@ Generate a detailed review report with severity levels."""
             verdict = "✅ **APPROVED** - Code meets quality standards."
             next_step = "Proceed to Agent 05 (Integrator)."
         
-        report.extend([
-            "## Verdict",
-            "",
-            verdict,
-            "",
-            f"**Next Step:** {next_step}"
-        ])
+        w("## Verdict\n\n")
+        w(f"{verdict}\n\n")
+        w(f"**Next Step:** {next_step}")
         
-        return "\n".join(report)
+        return buf.getvalue()
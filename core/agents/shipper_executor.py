@@ -4,24 +4,153 @@ Agent 08: Release Engineering and Deployment Preparation
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 from core.agent_executor import AgentExecutor, AgentResult, Artifact
+from core.async_io import read_files_parallel
 import subprocess
 import json
+import os
 import re
+import shutil
+import signal
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Event, Lock
+from fnmatch import fnmatch
+from itertools import islice
+
+
+SCAN_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.py')
+SCAN_EXCLUDED_DIRS = frozenset({'node_modules', '.next', 'dist', '__pycache__', '.git'})
+
+# Anchored to the end of the file, not of a line. ripgrep is line-oriented,
+# so this pattern is checked separately against each file's last bytes.
+_ENV_TAIL_PATTERN = r'\.env(?:\.local|\.development)?$'
+_ENV_TAIL_RE = re.compile(_ENV_TAIL_PATTERN, re.IGNORECASE)
+_ENV_TAIL_BYTES = 32
+
+# Report order of the pre-flight phases, and the blocker prefix for those
+# whose failure blocks the release (the others only warn)
+_PHASE_ORDER = ('Dependencies', 'Build', 'Tests', 'Security', 'Documentation', 'Bundle')
+_BLOCKING_PHASES = {
+    'Dependencies': 'Install failed',
+    'Build': 'Build failed',
+    'Tests': 'Tests failed',
+    'Security': 'Security issues',
+}
+
+
+# Fixed closing sections of the release report
+_REQUIRED_ACTIONS = """## Required Actions
+
+1. Fix all blocking issues
+2. Run Agent 07 (Medic) for automated fixes
+3. Re-run Agent 04 (Reviewer) to verify
+4. Re-run Agent 08 (Shipper) when ready"""
+
+_DEPLOYMENT_CHECKLIST = """## Deployment Checklist
+
+- [ ] Verify all tests pass in CI
+- [ ] Create git tag for release
+- [ ] Update CHANGELOG.md
+- [ ] Deploy to staging first
+- [ ] Monitor for errors after deployment
+- [ ] Communicate release to stakeholders"""
+
+
+def _read_gitignore(path: Path) -> FrozenSet[str]:
+    """Top-level .gitignore patterns, normalised (comments/negations dropped)
+    
+    Leading `/` and `**/` are stripped: for the root-level names checked
+    here, `/.env` and `**/.env` both mean `.env`.
+    """
+    patterns = set()
+    for line in path.read_text(encoding='utf-8', errors='ignore').splitlines():
+        line = line.strip()
+        if line and not line.startswith(('#', '!')):
+            line = line.strip('/')
+            while line.startswith('**/'):
+                line = line[3:].lstrip('/')
+            if line:
+                patterns.add(line)
+    return frozenset(patterns)
+
+
+def _gitignored(name: str, patterns: FrozenSet[str]) -> bool:
+    """Whether a root-level file name is covered by the .gitignore patterns"""
+    return name in patterns or any(fnmatch(name, p) for p in patterns if '*' in p or '?' in p or '[' in p)
+
+
+def _ends_with_env(path: Path) -> bool:
+    """Whether a file's text ends in an env file name (_ENV_TAIL_PATTERN)"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - _ENV_TAIL_BYTES))
+            tail = f.read()
+    except OSError:
+        return False
+    # Same newline handling as the text-mode read on the Python path
+    tail = tail.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+    return _ENV_TAIL_RE.search(tail) is not None
+
+
+def _dir_size(root: Path, cap: Optional[int] = None) -> int:
+    """Total size of files under root (scandir walk; DirEntry caches the stat).
+    
+    With cap set, returns as soon as the running total exceeds it.
+    """
+    total = 0
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        total += entry.stat().st_size
+                        if cap is not None and total > cap:
+                            return total
+        except OSError:
+            continue
+    return total
+
+
+def _kill_process_tree(proc: subprocess.Popen) -> None:
+    """Kill a command started by _run_process along with anything it spawned"""
+    try:
+        if os.name == 'posix':
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except OSError:
+        pass
 
 
 class ShipperExecutor(AgentExecutor):
     """Agent 08: Shipper - Release engineering and deployment"""
 
-    def __init__(self, workspace: Path, ai_provider=None, skill_loader=None):
+    # Fallback for pyproject.toml when tomllib is unavailable or finds no version
+    _VERSION_RE = re.compile(r'version\s*=\s*["\']([^"\']+)["\']')
+
+    def __init__(self, workspace: Path, ai_provider=None, skill_loader=None,
+                 max_pipeline_seconds: int = 900):
         super().__init__(workspace, ai_provider, skill_loader)
         
         # Release thresholds
         self.min_coverage = 80  # Minimum test coverage percentage
         self.max_bundle_size_mb = 5  # Maximum bundle size
         
+        # Ceiling on the whole pre-flight run (phases alone can add up to ~18 min)
+        self.max_pipeline_seconds = max_pipeline_seconds
+        self._children: Set[subprocess.Popen] = set()
+        self._children_lock = Lock()
+        self._cancelled = Event()
+        
+        self._pkg_cache: Optional[Dict] = None
+        self._chain_results: List[Tuple[str, Tuple[bool, str]]] = []  # build-chain phases finished so far
+        
         # Forbidden patterns in releases
         self.forbidden_patterns = [
             r'password\s*=\s*["\'][^"\']+',
@@ -29,50 +158,64 @@ class ShipperExecutor(AgentExecutor):
             r'secret\s*=\s*["\'][^"\']+',
             r'console\.log\s*\(',
             r'debugger\s*;?',
-            r'\.env(?:\.local|\.development)?$',
+            _ENV_TAIL_PATTERN,
         ]
+        # One alternation: a single scan per file instead of one per pattern.
+        # No MULTILINE: `$` is end of file, as with the per-pattern re.search.
+        self._forbidden_re = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.forbidden_patterns),
+            re.IGNORECASE
+        )
 
     def execute(self, query: str, context: Dict, **kwargs) -> AgentResult:
         """Execute release preparation and build verification"""
         checks = []
         blockers = []
         warnings = []
+        self._pkg_cache = None  # re-read package.json once per run
+        self._cancelled.clear()
+        self._chain_results = []
+        
+        # Install -> build -> tests -> bundle depend on each other (bundle
+        # measures the build output), so they run in order as one task.
+        # The security and docs scans only read sources, so they overlap
+        # with the long-running npm steps.
+        pool = ThreadPoolExecutor(max_workers=3)
+        chain_future = pool.submit(self._run_build_chain)
+        security_future = pool.submit(self._security_scan)
+        docs_future = pool.submit(self._check_documentation)
+        
+        _, pending = wait([chain_future, security_future, docs_future],
+                          timeout=self.max_pipeline_seconds)
+        if pending:
+            # Stop spawning, kill whatever is running and report what finished
+            self._cancelled.set()
+            self._kill_children()
+            pool.shutdown(wait=False)
+            finished = list(self._chain_results)  # the chain thread may still append
+            for name, future in (('Security', security_future), ('Documentation', docs_future)):
+                if future.done():
+                    finished.append((name, future.result()))
+            for name, result in sorted(finished, key=lambda item: _PHASE_ORDER.index(item[0])):
+                self._record_check(name, result, checks, blockers, warnings)
+            blockers.append(f"Pipeline timeout: pre-flight checks exceeded {self.max_pipeline_seconds}s")
+            return self._blocked_release(checks, blockers, warnings)
+        pool.shutdown()
         
-        # Phase 0: NPM Install (for Node.js projects)
-        install_result = self._verify_npm_install()
-        checks.append(('Dependencies', install_result))
-        if not install_result[0]:
-            blockers.append(f"Install failed: {install_result[1]}")
+        install_result, build_result, test_result, bundle_result = chain_future.result()
         
+        # Phase 0: NPM Install (for Node.js projects)
+        self._record_check('Dependencies', install_result, checks, blockers, warnings)
         # Phase 1: Build verification
-        build_result = self._verify_build()
-        checks.append(('Build', build_result))
-        if not build_result[0]:
-            blockers.append(f"Build failed: {build_result[1]}")
-        
+        self._record_check('Build', build_result, checks, blockers, warnings)
         # Phase 2: Test verification
-        test_result = self._verify_tests()
-        checks.append(('Tests', test_result))
-        if not test_result[0]:
-            blockers.append(f"Tests failed: {test_result[1]}")
-        
+        self._record_check('Tests', test_result, checks, blockers, warnings)
         # Phase 3: Security scan
-        security_result = self._security_scan()
-        checks.append(('Security', security_result))
-        if not security_result[0]:
-            blockers.append(f"Security issues: {security_result[1]}")
-        
+        self._record_check('Security', security_future.result(), checks, blockers, warnings)
         # Phase 4: Documentation check
-        docs_result = self._check_documentation()
-        checks.append(('Documentation', docs_result))
-        if not docs_result[0]:
-            warnings.append(f"Documentation: {docs_result[1]}")
-        
+        self._record_check('Documentation', docs_future.result(), checks, blockers, warnings)
         # Phase 5: Bundle analysis (for web projects)
-        bundle_result = self._analyze_bundle()
-        checks.append(('Bundle', bundle_result))
-        if not bundle_result[0]:
-            warnings.append(f"Bundle: {bundle_result[1]}")
+        self._record_check('Bundle', bundle_result, checks, blockers, warnings)
         
         # Phase 6: Generate artifacts
         if blockers:
@@ -80,6 +223,32 @@ class ShipperExecutor(AgentExecutor):
         else:
             return self._prepare_release(checks, warnings, context)
 
+    @staticmethod
+    def _record_check(name: str, result: Tuple[bool, str], checks: List,
+                      blockers: List[str], warnings: List[str]) -> None:
+        """Add a phase result to the report; a failure becomes a blocker or warning"""
+        checks.append((name, result))
+        if not result[0]:
+            if name in _BLOCKING_PHASES:
+                blockers.append(f"{_BLOCKING_PHASES[name]}: {result[1]}")
+            else:
+                warnings.append(f"{name}: {result[1]}")
+
+    def _run_build_chain(self) -> Tuple[Tuple[bool, str], ...]:
+        """Phases that must run in order: install, build, tests, bundle
+        
+        Each result is appended to _chain_results as it finishes, so a
+        pipeline timeout can still report the phases that completed.
+        """
+        for name, phase in (('Dependencies', self._verify_npm_install),
+                            ('Build', self._verify_build),
+                            ('Tests', self._verify_tests),
+                            ('Bundle', self._analyze_bundle)):
+            if self._cancelled.is_set():
+                break
+            self._chain_results.append((name, phase()))
+        return tuple(result for _, result in self._chain_results)
+
     def _verify_npm_install(self) -> Tuple[bool, str]:
         """Verify npm install succeeds (dependencies can be installed)"""
         # Check multiple possible locations for package.json
@@ -89,32 +258,24 @@ class ShipperExecutor(AgentExecutor):
             self.workspace / 'backend',
         ]
         
-        installed = False
-        for loc in locations:
-            package_json = loc / 'package.json'
-            if package_json.exists():
-                print(f"   [SHIP] Running npm install in {loc.name or 'root'}...")
-                try:
-                    result = subprocess.run(
-                        'npm install',
-                        shell=True,
-                        cwd=str(loc),
-                        capture_output=True,
-                        text=True,
-                        timeout=180  # 3 minutes
-                    )
-                    if result.returncode == 0:
-                        print(f"   [SHIP] ✅ npm install succeeded in {loc.name or 'root'}")
-                        installed = True
-                    else:
-                        error_msg = result.stderr[:200] if result.stderr else "Unknown error"
-                        return False, f"npm install failed in {loc.name or 'root'}: {error_msg}"
-                except subprocess.TimeoutExpired:
-                    return False, f"npm install timed out in {loc.name or 'root'}"
-                except Exception as e:
-                    return False, f"npm install error: {str(e)}"
-        
-        if installed:
+        targets = [loc for loc in locations if (loc / 'package.json').exists()]
+        
+        # A workspaces root installs its members into one shared node_modules
+        # and lockfile; child installs would race on them
+        if self._has_package_json() and self._root_covers_children(targets[1:]):
+            targets = targets[:1]
+        
+        # Independent installs (frontend + backend, no root package.json):
+        # run them side by side. With a root package.json, one at a time.
+        if len(targets) > 1 and not self._has_package_json():
+            with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+                errors = [e for e in pool.map(self._npm_install, targets) if e]
+        else:
+            errors = [e for e in map(self._npm_install, targets) if e]
+        if errors:
+            return False, "; ".join(errors)
+        
+        if targets:
             return True, "Dependencies installed successfully"
         
         # No package.json found - check for Python
@@ -123,19 +284,63 @@ class ShipperExecutor(AgentExecutor):
         
         return True, "No package.json found (static project?)"
 
+    def _root_covers_children(self, children: List[Path]) -> bool:
+        """Whether the root package.json / lockfile manages the child packages"""
+        if not children:
+            return False
+        try:
+            if self._package_json().get('workspaces'):
+                return True
+        except (OSError, ValueError):
+            pass
+        if (self.workspace / 'pnpm-workspace.yaml').exists():
+            return True
+        lockfile = self.workspace / 'package-lock.json'
+        if lockfile.exists():
+            try:
+                packages = json.loads(lockfile.read_text(encoding='utf-8')).get('packages', {})
+            except (OSError, ValueError):
+                return False
+            return any(child.name in packages for child in children)
+        return False
+
+    def _npm_install(self, loc: Path) -> Optional[str]:
+        """Run npm install in one location; returns an error message or None"""
+        name = loc.name or 'root'
+        print(f"   [SHIP] Running npm install in {name}...")
+        try:
+            returncode, _, stderr = self._run_process(['npm', 'install'], cwd=str(loc), timeout=180)  # 3 minutes
+            if returncode == 0:
+                print(f"   [SHIP] ✅ npm install succeeded in {name}")
+                return None
+            error_msg = stderr[:200] if stderr else "Unknown error"
+            return f"npm install failed in {name}: {error_msg}"
+        except subprocess.TimeoutExpired:
+            return f"npm install timed out in {name}"
+        except Exception as e:
+            return f"npm install error: {str(e)}"
+
+    def _has_package_json(self) -> bool:
+        """Whether the workspace root has a package.json"""
+        return (self.workspace / 'package.json').exists()
+
+    def _package_json(self) -> Dict:
+        """Parsed root package.json, loaded once and shared by the build/test/version phases"""
+        if self._pkg_cache is None:
+            package_json = self.workspace / 'package.json'
+            self._pkg_cache = json.loads(package_json.read_text(encoding='utf-8'))
+        return self._pkg_cache
 
     def _verify_build(self) -> Tuple[bool, str]:
         """Verify production build succeeds"""
-        package_json = self.workspace / 'package.json'
-        
-        if package_json.exists():
+        if self._has_package_json():
             # Node.js project
             try:
-                pkg = json.loads(package_json.read_text(encoding='utf-8'))
+                pkg = self._package_json()
                 scripts = pkg.get('scripts', {})
                 
                 if 'build' in scripts:
-                    result = self._run_command('npm run build', timeout=300)
+                    result = self._run_command(['npm', 'run', 'build'], timeout=300)
                     if result is not None:
                         return True, "Build successful"
                     else:
@@ -149,7 +354,7 @@ class ShipperExecutor(AgentExecutor):
         # Python project
         pyproject = self.workspace / 'pyproject.toml'
         if pyproject.exists():
-            result = self._run_command('python -m build', timeout=120)
+            result = self._run_command(['python', '-m', 'build'], timeout=120)
             if result is not None:
                 return True, "Build successful"
             else:
@@ -160,15 +365,13 @@ class ShipperExecutor(AgentExecutor):
 
     def _verify_tests(self) -> Tuple[bool, str]:
         """Verify tests pass"""
-        package_json = self.workspace / 'package.json'
-        
-        if package_json.exists():
+        if self._has_package_json():
             try:
-                pkg = json.loads(package_json.read_text(encoding='utf-8'))
+                pkg = self._package_json()
                 scripts = pkg.get('scripts', {})
                 
                 if 'test' in scripts:
-                    result = self._run_command('npm test -- --passWithNoTests', timeout=300)
+                    result = self._run_command(['npm', 'test', '--', '--passWithNoTests'], timeout=300)
                     if result is not None:
                         return True, "All tests passed"
                     else:
@@ -181,7 +384,7 @@ class ShipperExecutor(AgentExecutor):
         
         # Python project
         if (self.workspace / 'pytest.ini').exists() or (self.workspace / 'tests').is_dir():
-            result = self._run_command('python -m pytest --tb=short', timeout=300)
+            result = self._run_command(['python', '-m', 'pytest', '--tb=short'], timeout=300)
             if result is not None:
                 return True, "All tests passed"
             else:
@@ -193,53 +396,76 @@ class ShipperExecutor(AgentExecutor):
         """Scan for security issues"""
         issues = []
         
-        # Get all source files
-        source_files = list(self.workspace.rglob('*.ts'))
-        source_files.extend(self.workspace.rglob('*.tsx'))
-        source_files.extend(self.workspace.rglob('*.js'))
-        source_files.extend(self.workspace.rglob('*.jsx'))
-        source_files.extend(self.workspace.rglob('*.py'))
-        
-        # Filter out common non-source directories
-        source_files = [f for f in source_files 
-                        if 'node_modules' not in str(f)
-                        and '.next' not in str(f)
-                        and 'dist' not in str(f)
-                        and '__pycache__' not in str(f)]
-        
-        for file_path in source_files[:100]:  # Limit for performance
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                
-                for pattern in self.forbidden_patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        rel_path = str(file_path.relative_to(self.workspace))
-                        issues.append(f"{rel_path}: matches forbidden pattern")
-                        break
-                        
-            except Exception:
-                pass
+        # Get source files (single pruned walk, limited for performance)
+        source_files = list(islice(self._iter_source_files(), 100))
         
-        # Check for .env in git
+        # Prefer ripgrep when installed; otherwise read the files on the async
+        # reader's thread pool and run the combined regex in Python
+        matched = self._rg_matching_files(source_files)
+        if matched is not None:
+            flagged = [f for f in source_files if str(f) in matched or _ends_with_env(f)]
+        else:
+            unreadable: Dict[Path, str] = {}
+            contents = read_files_parallel(source_files, unreadable)
+            flagged = [f for f, content in contents.items() if self._forbidden_re.search(content)]
+            # A file that could not be read cannot be cleared
+            for file_path in unreadable:
+                issues.append(f"{file_path.relative_to(self.workspace)}: could not be read for scanning")
+        for file_path in flagged:
+            rel_path = str(file_path.relative_to(self.workspace))
+            issues.append(f"{rel_path}: matches forbidden pattern")
+        
+        # Check for .env in git (.gitignore read and parsed once)
         gitignore = self.workspace / '.gitignore'
         if gitignore.exists():
-            gitignore_content = gitignore.read_text(encoding='utf-8', errors='ignore')
-            if '.env' not in gitignore_content:
+            patterns = _read_gitignore(gitignore)
+            if not _gitignored('.env', patterns):
                 issues.append(".env not in .gitignore")
-        
-        # Check for env files that shouldn't be committed
-        for env_file in ['.env', '.env.local', '.env.production']:
-            if (self.workspace / env_file).exists():
-                # Check if it's in gitignore
-                if gitignore.exists():
-                    if env_file not in gitignore_content:
-                        issues.append(f"{env_file} exists but not in .gitignore")
+            
+            # Check for env files that shouldn't be committed
+            root_names = set(os.listdir(self.workspace))
+            for env_file in ['.env', '.env.local', '.env.production']:
+                if env_file in root_names and not _gitignored(env_file, patterns):
+                    issues.append(f"{env_file} exists but not in .gitignore")
         
         if issues:
             return False, f"{len(issues)} security issues found"
         
         return True, "No security issues detected"
 
+    def _iter_source_files(self) -> Iterator[Path]:
+        """Yield source files, pruning non-source directories before descending"""
+        for root, dirnames, filenames in os.walk(self.workspace):
+            dirnames[:] = [d for d in dirnames if d not in SCAN_EXCLUDED_DIRS]
+            for name in filenames:
+                if name.endswith(SCAN_EXTENSIONS):
+                    yield Path(root) / name
+
+    def _rg_matching_files(self, files: List[Path]) -> Optional[Set[str]]:
+        """Paths (as given) matching a forbidden pattern per ripgrep; None if rg is unavailable or errors
+        
+        _ENV_TAIL_PATTERN is left to _ends_with_env: rg would read its `$` as end of line.
+        """
+        rg = shutil.which('rg')
+        if not rg or not files:
+            return None
+        
+        argv = [rg, '--files-with-matches', '--ignore-case', '--no-config', '--no-messages']
+        for pattern in self.forbidden_patterns:
+            if pattern != _ENV_TAIL_PATTERN:
+                argv.extend(['-e', pattern])
+        argv.append('--')
+        argv.extend(str(f) for f in files)
+        try:
+            result = subprocess.run(argv, capture_output=True, text=True,
+                                    errors='surrogateescape', timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        # 0 = matches, 1 = no matches; anything else (bad pattern, unreadable file) -> Python path
+        if result.returncode not in (0, 1):
+            return None
+        return set(result.stdout.splitlines())
+
     def _check_documentation(self) -> Tuple[bool, str]:
         """Check documentation completeness"""
         missing = []
@@ -276,11 +502,13 @@ class ShipperExecutor(AgentExecutor):
         # Check for Next.js .next folder
         next_dir = self.workspace / '.next'
         if next_dir.exists():
-            total_size = sum(f.stat().st_size for f in next_dir.rglob('*') if f.is_file())
+            # Only "too large" vs not matters past 2x the budget: stop counting there
+            too_large_mb = self.max_bundle_size_mb * 2
+            total_size = _dir_size(next_dir, cap=too_large_mb * 1024 * 1024)
             size_mb = total_size / (1024 * 1024)
             
-            if size_mb > self.max_bundle_size_mb * 2:
-                return False, f"Bundle too large: {size_mb:.1f}MB"
+            if size_mb > too_large_mb:
+                return False, f"Bundle too large: >{too_large_mb:.1f}MB"
             elif size_mb > self.max_bundle_size_mb:
                 return True, f"Bundle acceptable: {size_mb:.1f}MB (consider optimization)"
             else:
@@ -289,7 +517,7 @@ class ShipperExecutor(AgentExecutor):
         # Check for dist folder
         dist_dir = self.workspace / 'dist'
         if dist_dir.exists():
-            total_size = sum(f.stat().st_size for f in dist_dir.rglob('*') if f.is_file())
+            total_size = _dir_size(dist_dir)
             size_mb = total_size / (1024 * 1024)
             
             if size_mb > self.max_bundle_size_mb:
@@ -367,10 +595,9 @@ class ShipperExecutor(AgentExecutor):
     def _determine_version(self) -> str:
         """Determine version for release"""
         # Try to read from package.json
-        package_json = self.workspace / 'package.json'
-        if package_json.exists():
+        if self._has_package_json():
             try:
-                pkg = json.loads(package_json.read_text(encoding='utf-8'))
+                pkg = self._package_json()
                 return pkg.get('version', '1.0.0')
             except Exception:
                 pass
@@ -380,7 +607,10 @@ class ShipperExecutor(AgentExecutor):
         if pyproject.exists():
             try:
                 content = pyproject.read_text(encoding='utf-8')
-                match = re.search(r'version\s*=\s*["\']([^"\']+)["\']', content)
+                version = self._pyproject_version(content)
+                if version:
+                    return version
+                match = self._VERSION_RE.search(content)
                 if match:
                     return match.group(1)
             except Exception:
@@ -389,6 +619,17 @@ class ShipperExecutor(AgentExecutor):
         # Default
         return datetime.now().strftime('%Y.%m.%d')
 
+    @staticmethod
+    def _pyproject_version(content: str) -> Optional[str]:
+        """[project] or [tool.poetry] version via tomllib (Python 3.11+)"""
+        try:
+            import tomllib
+            data = tomllib.loads(content)
+        except (ImportError, ValueError):
+            return None
+        project_version = data.get('project', {}).get('version')
+        return project_version or data.get('tool', {}).get('poetry', {}).get('version')
+
     def _generate_changelog_entry(self, version: str, context: Dict) -> str:
         """Generate CHANGELOG entry"""
         today = datetime.now().strftime('%Y-%m-%d')
@@ -449,74 +690,74 @@ class ShipperExecutor(AgentExecutor):
 
     def _generate_release_report(self, checks: List, blockers: List[str], warnings: List[str], blocked: bool) -> str:
         """Generate comprehensive release report"""
-        lines = [
-            "# Release Report",
-            "",
-            f"**Status:** {'🛑 BLOCKED' if blocked else '✅ READY'}",
-            f"**Generated:** {datetime.now().isoformat()}",
-            "",
-            "## Pre-Flight Checks",
-            ""
+        check_rows = "".join(
+            f"| {'✅' if passed else '❌'} | {check_name} | {message} |\n"
+            for check_name, (passed, message) in checks
+        )
+        parts = [
+            "# Release Report\n\n"
+            f"**Status:** {'🛑 BLOCKED' if blocked else '✅ READY'}\n"
+            f"**Generated:** {datetime.now().isoformat()}\n\n"
+            "## Pre-Flight Checks\n\n"
+            f"{check_rows}\n"
         ]
         
-        for check_name, (passed, message) in checks:
-            status = "✅" if passed else "❌"
-            lines.append(f"| {status} | {check_name} | {message} |")
-        
-        lines.append("")
-        
         if blockers:
-            lines.extend([
-                "## 🛑 Blocking Issues",
-                ""
-            ])
-            for blocker in blockers:
-                lines.append(f"- {blocker}")
-            lines.append("")
+            parts.append("## 🛑 Blocking Issues\n\n")
+            parts.extend(f"- {blocker}\n" for blocker in blockers)
+            parts.append("\n")
         
         if warnings:
-            lines.extend([
-                "## ⚠️ Warnings",
-                ""
-            ])
-            for warning in warnings:
-                lines.append(f"- {warning}")
-            lines.append("")
-        
-        if blocked:
-            lines.extend([
-                "## Required Actions",
-                "",
-                "1. Fix all blocking issues",
-                "2. Run Agent 07 (Medic) for automated fixes",
-                "3. Re-run Agent 04 (Reviewer) to verify",
-                "4. Re-run Agent 08 (Shipper) when ready",
-            ])
-        else:
-            lines.extend([
-                "## Deployment Checklist",
-                "",
-                "- [ ] Verify all tests pass in CI",
-                "- [ ] Create git tag for release",
-                "- [ ] Update CHANGELOG.md",
-                "- [ ] Deploy to staging first",
-                "- [ ] Monitor for errors after deployment",
-                "- [ ] Communicate release to stakeholders",
-            ])
-        
-        return "\n".join(lines)
-
-    def _run_command(self, command: str, timeout: int = 60) -> Optional[str]:
-        """Run a shell command"""
+            parts.append("## ⚠️ Warnings\n\n")
+            parts.extend(f"- {warning}\n" for warning in warnings)
+            parts.append("\n")
+        
+        parts.append(_REQUIRED_ACTIONS if blocked else _DEPLOYMENT_CHECKLIST)
+        return "".join(parts)
+
+    def _run_command(self, argv: List[str], timeout: int = 60) -> Optional[str]:
+        """Run a command (argv list, no shell)"""
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=str(self.workspace),
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            return result.stdout if result.returncode == 0 else None
+            returncode, stdout, _ = self._run_process(argv, cwd=str(self.workspace), timeout=timeout)
+            return stdout if returncode == 0 else None
         except Exception:
             return None
+
+    def _run_process(self, argv: List[str], cwd: str, timeout: int) -> Tuple[int, str, str]:
+        """Run a command as a tracked child so a pipeline timeout can kill it"""
+        # Resolve via PATH ourselves: no /bin/sh in between, and on Windows
+        # this finds the npm.cmd shim that a bare 'npm' argv would miss
+        executable = shutil.which(argv[0])
+        if executable is None:
+            raise FileNotFoundError(f"{argv[0]} not found on PATH")
+        with self._children_lock:
+            if self._cancelled.is_set():
+                raise RuntimeError("Pipeline cancelled")
+            proc = subprocess.Popen(
+                [executable, *argv[1:]],
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                # Own process group, so a kill also reaches npm's child processes
+                start_new_session=(os.name == 'posix')
+            )
+            self._children.add(proc)
+        try:
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill_process_tree(proc)
+                proc.communicate()
+                raise
+            return proc.returncode, stdout, stderr
+        finally:
+            with self._children_lock:
+                self._children.discard(proc)
+
+    def _kill_children(self) -> None:
+        """Kill every command still running for this executor"""
+        with self._children_lock:
+            children = list(self._children)
+        for proc in children:
+            _kill_process_tree(proc)
@@ -3,15 +3,50 @@ Artifact Registry
 Track and manage artifacts created during pipeline execution
 """
 
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import DefaultDict, Dict, List, Optional, Tuple
 import json
-import shutil
 import hashlib
+import os
+import stat
+import tarfile
+import time
 from threading import Lock
 
+_HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Files modified this close to their last hash are re-hashed: a same-size
+# rewrite within one mtime tick would otherwise look unchanged
+_RACY_WINDOW_NS = 2_000_000_000
+# Fixed pool of per-path locks (indexed by path hash) so the set never grows
+_PATH_LOCK_STRIPES = 64
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 of a file, streamed so memory stays flat for large artifacts"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class _HashingReader:
+    """File wrapper that feeds every chunk read through a digest"""
+
+    def __init__(self, f, digest):
+        self._f = f
+        self._digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._f.read(size)
+        self._digest.update(chunk)
+        return chunk
+
 
 @dataclass
 class ArtifactEntry:
@@ -21,6 +56,7 @@ class ArtifactEntry:
     created_at: datetime
     checksum: str
     size_bytes: int
+    archive_offset: Optional[int] = None  # data offset inside the run's artifacts.tar
 
 
 class ArtifactRegistry:
@@ -31,24 +67,88 @@ class ArtifactRegistry:
         self.registry_dir = workspace / ".vibecode" / "artifacts"
         self.registry_dir.mkdir(parents=True, exist_ok=True)
         self._entries: Dict[str, ArtifactEntry] = {}
+        # Secondary indexes (agent_id / artifact_type -> path -> entry), kept in sync by _index
+        self._by_agent: DefaultDict[str, Dict[str, ArtifactEntry]] = defaultdict(dict)
+        self._by_type: DefaultDict[str, Dict[str, ArtifactEntry]] = defaultdict(dict)
         self._run_id: Optional[str] = None
-        self._lock = Lock()  # Thread safety for register operations
+        self._lock = Lock()  # Guards _entries/_run_id; held only briefly
+        # Serializes hash + archive per artifact path (paths sharing a stripe also wait on each other)
+        self._path_locks: List[Lock] = [Lock() for _ in range(_PATH_LOCK_STRIPES)]
+        # path -> (st_mtime_ns, st_size, hashed_at_ns, checksum, run_id archived into, tar offset)
+        self._hash_cache: Dict[str, Tuple[int, int, int, str, Optional[str], Optional[int]]] = {}
+        # One append-only tar per run instead of a file copy per artifact
+        self._archive_tar: Optional[tarfile.TarFile] = None
+        self._archive_lock = Lock()
 
     def start_run(self, run_id: str) -> None:
         """Start new pipeline run"""
-        self._run_id = run_id
-        self._entries = {}
+        self._close_archive()
         run_dir = self.registry_dir / run_id
         run_dir.mkdir(exist_ok=True)
+        archive = run_dir / "artifacts.tar"
+        with self._archive_lock:
+            # The file object is ours, not tarfile's, so _close_archive can
+            # fsync it after tar.close() has written the end-of-archive blocks
+            if archive.exists():
+                self._archive_tar = tarfile.open(fileobj=open(archive, 'r+b'), mode='a')
+            else:
+                self._archive_tar = tarfile.open(fileobj=open(archive, 'w+b'), mode='w')
+        with self._lock:
+            self._run_id = run_id
+            self._entries = {}
+            self._by_agent.clear()
+            self._by_type.clear()
+
+    def finish_run(self) -> None:
+        """Write the manifest and close the run archive (flushed to disk once)"""
+        self.save_manifest()
+        self._close_archive()
+
+    def _close_archive(self) -> None:
+        with self._archive_lock:
+            tar, self._archive_tar = self._archive_tar, None
+        if tar is not None:
+            fileobj = tar.fileobj
+            try:
+                tar.close()  # writes the end-of-archive blocks
+                fileobj.flush()
+                os.fsync(fileobj.fileno())
+            finally:
+                fileobj.close()
 
     def register(self, path: str, agent_id: str, artifact_type: str) -> None:
         """Register artifact created by agent (thread-safe)"""
+        full_path = self.workspace / path
+        if not full_path.exists():
+            return
+
         with self._lock:
-            full_path = self.workspace / path
-            if not full_path.exists():
-                return
+            run_id = self._run_id
+        path_lock = self._path_locks[hash(path) % _PATH_LOCK_STRIPES]
 
-            checksum = hashlib.sha256(full_path.read_bytes()).hexdigest()
+        # Hash/archive outside the registry lock so different artifacts register
+        # concurrently; the per-path lock keeps one artifact's retries in order
+        with path_lock:
+            st = full_path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._hash_cache.get(path)
+            hashed_at = time.time_ns()
+            if cached and cached[:2] == stamp and st.st_mtime_ns < cached[2] - _RACY_WINDOW_NS:
+                # Unchanged since last registration (e.g. a retry): reuse the
+                # checksum and only archive if this run has no copy yet
+                hashed_at, checksum, archived_run, offset = cached[2:]
+                size = st.st_size
+                if run_id and archived_run != run_id:
+                    checksum, offset, size = self._archive(full_path, path, st, known_checksum=checksum)
+                    archived_run = run_id
+            elif run_id:
+                # Append to the run archive, hashing the same bytes as they are written
+                checksum, offset, size = self._archive(full_path, path, st)
+                archived_run = run_id
+            else:
+                checksum = _file_sha256(full_path)
+                archived_run, offset, size = None, None, st.st_size
+            self._hash_cache[path] = (*stamp, hashed_at, checksum, archived_run, offset)
 
             entry = ArtifactEntry(
                 path=path,
@@ -56,23 +156,65 @@ class ArtifactRegistry:
                 artifact_type=artifact_type,
                 created_at=datetime.now(),
                 checksum=checksum,
-                size_bytes=full_path.stat().st_size
+                size_bytes=size,
+                archive_offset=offset
             )
-            self._entries[path] = entry
 
-            # Copy to run archive
-            if self._run_id:
-                archive_path = self.registry_dir / self._run_id / path
-                archive_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(full_path, archive_path)
+        with self._lock:
+            if self._run_id == run_id:  # drop results from a run that has since been replaced
+                self._index(entry)
+
+    def _archive(self, full_path: Path, path: str, st: os.stat_result,
+                 known_checksum: Optional[str] = None) -> Tuple[str, Optional[int], int]:
+        """Append an artifact to the run tar; returns (checksum, data offset, size archived)
+        
+        The header is built from the caller's stat. If the file no longer
+        has that many bytes when read, the partial member is cut off the tar
+        and the artifact is only hashed (offset None).
+        """
+        digest = hashlib.sha256() if known_checksum is None else None
+        with self._archive_lock:
+            tar = self._archive_tar
+            if tar is None:  # run already finished: just hash
+                return known_checksum or _file_sha256(full_path), None, st.st_size
+            info = tarfile.TarInfo(path)
+            info.size = st.st_size
+            info.mtime = int(st.st_mtime)
+            info.mode = stat.S_IMODE(st.st_mode)
+            info.uid, info.gid = getattr(st, 'st_uid', 0), getattr(st, 'st_gid', 0)
+            start = tar.offset
+            try:
+                with open(full_path, 'rb') as f:
+                    tar.addfile(info, _HashingReader(f, digest) if digest else f)
+            except OSError:
+                # Changed under us (e.g. truncated): drop the partial member
+                tar.fileobj.seek(start)
+                tar.fileobj.truncate()
+                tar.offset = start
+                return _file_sha256(full_path), None, full_path.stat().st_size
+            # addfile works on a copy of info; the data block ends where the tar now is
+            offset = tar.offset - -(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+        return known_checksum or digest.hexdigest(), offset, info.size
+
+    def _index(self, entry: ArtifactEntry) -> None:
+        """Store entry and keep the agent/type indexes in step (caller holds _lock)"""
+        old = self._entries.get(entry.path)
+        if old is not None:
+            if old.agent_id != entry.agent_id:
+                del self._by_agent[old.agent_id][entry.path]
+            if old.artifact_type != entry.artifact_type:
+                del self._by_type[old.artifact_type][entry.path]
+        self._entries[entry.path] = entry
+        self._by_agent[entry.agent_id][entry.path] = entry
+        self._by_type[entry.artifact_type][entry.path] = entry
 
     def get_by_agent(self, agent_id: str) -> List[ArtifactEntry]:
         """Get artifacts created by specific agent"""
-        return [e for e in self._entries.values() if e.agent_id == agent_id]
+        return list(self._by_agent.get(agent_id, {}).values())
 
     def get_by_type(self, artifact_type: str) -> List[ArtifactEntry]:
         """Get artifacts of specific type"""
-        return [e for e in self._entries.values() if e.artifact_type == artifact_type]
+        return list(self._by_type.get(artifact_type, {}).values())
 
     def rollback_run(self, run_id: str) -> bool:
         """Rollback artifacts from a run (delete created files)"""
@@ -100,7 +242,9 @@ class ArtifactRegistry:
                 "path": e.path,
                 "agent_id": e.agent_id,
                 "type": e.artifact_type,
-                "checksum": e.checksum
+                "checksum": e.checksum,
+                "size": e.size_bytes,
+                "archive_offset": e.archive_offset
             }
             for e in self._entries.values()
         ]
@@ -5,9 +5,12 @@ Provides non-blocking file operations with concurrency control.
 """
 
 import asyncio
+import atexit
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 import os
 
 
@@ -20,7 +23,7 @@ class AsyncFileReader:
 
     async def read_file(self, path: Path) -> str:
         """Read single file asynchronously."""
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             self._executor,
             lambda: self._read_file_safe(path)
@@ -33,35 +36,52 @@ class AsyncFileReader:
         except (IOError, OSError, UnicodeDecodeError) as e:
             return f"Error reading {path}: {e}"
 
-    async def read_files(self, paths: List[Path]) -> Dict[Path, str]:
-        """Read multiple files in parallel with semaphore control."""
-        semaphore = asyncio.Semaphore(self.max_concurrent)
-
-        async def read_with_limit(path: Path) -> tuple:
-            async with semaphore:
-                try:
-                    content = await self.read_file(path)
-                    return (path, content)
-                except Exception as e:
-                    return (path, f"Error: {e}")
-
+    async def read_files(
+        self,
+        paths: List[Path],
+        failures: Optional[Dict[Path, str]] = None
+    ) -> Dict[Path, str]:
+        """Read multiple files in parallel, one batch of paths per worker.
+
+        Unreadable files map to an error string, unless a failures dict is
+        given: then they are left out of the result and recorded there.
+        """
         if not paths:
             return {}
 
-        tasks = [read_with_limit(p) for p in paths]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # One executor hand-off per batch instead of per file: each worker
+        # reads its slice back to back, so small-file scans are not dominated
+        # by future/thread wake-up overhead.
+        batch_size = -(-len(paths) // self.max_concurrent)
+        batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
 
-        result_dict = {}
-        for result in results:
-            if isinstance(result, tuple) and len(result) == 2:
-                path, content = result
-                result_dict[path] = content
-            elif isinstance(result, Exception):
-                # Handle unexpected exceptions
-                pass
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._read_batch, batch) for batch in batches)
+        )
 
+        result_dict = {}
+        for batch, contents in zip(batches, results):
+            for path, (ok, text) in zip(batch, contents):
+                if ok or failures is None:
+                    result_dict[path] = text
+                else:
+                    failures[path] = text
         return result_dict
 
+    def _read_batch(self, paths: List[Path]) -> List[Tuple[bool, str]]:
+        """Read a batch of files sequentially on one worker thread.
+
+        Returns (True, content) or (False, error message) per path.
+        """
+        contents = []
+        for path in paths:
+            try:
+                contents.append((True, path.read_text(encoding='utf-8', errors='ignore')))
+            except Exception as e:
+                contents.append((False, f"Error reading {path}: {e}"))
+        return contents
+
     async def scan_directory(
         self,
         directory: Path,
@@ -92,31 +112,50 @@ class AsyncFileReader:
         self._executor.shutdown(wait=True)
 
 
+_default_reader: Optional[AsyncFileReader] = None
+_default_reader_lock = threading.Lock()
+
+
+def _get_default_reader() -> AsyncFileReader:
+    """Shared reader for the convenience functions (thread pool created once)."""
+    global _default_reader
+    if _default_reader is None:
+        with _default_reader_lock:
+            if _default_reader is None:
+                _default_reader = AsyncFileReader()
+                atexit.register(_default_reader.shutdown)
+    return _default_reader
+
+
 def run_async(coro):
     """Helper to run async code from synchronous context."""
     try:
-        loop = asyncio.get_event_loop()
+        asyncio.get_running_loop()
     except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        return asyncio.run(coro)
 
-    return loop.run_until_complete(coro)
+    # Called from inside a running loop: that loop cannot be blocked on,
+    # so run the coroutine to completion on a fresh loop in a helper thread.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
 
 
-async def read_files_async(paths: List[Path]) -> Dict[Path, str]:
+async def read_files_async(
+    paths: List[Path],
+    failures: Optional[Dict[Path, str]] = None
+) -> Dict[Path, str]:
     """Async file reading convenience function."""
-    reader = AsyncFileReader()
-    try:
-        return await reader.read_files(paths)
-    finally:
-        reader.shutdown()
+    return await _get_default_reader().read_files(paths, failures)
 
 
-def read_files_parallel(paths: List[Path]) -> Dict[Path, str]:
-    """Synchronous wrapper for async file reading."""
+def read_files_parallel(
+    paths: List[Path],
+    failures: Optional[Dict[Path, str]] = None
+) -> Dict[Path, str]:
+    """Synchronous wrapper for async file reading (see AsyncFileReader.read_files)."""
     if not paths:
         return {}
-    return run_async(read_files_async(paths))
+    return run_async(read_files_async(paths, failures))
 
 
 async def scan_directory_async(
@@ -125,23 +164,32 @@ async def scan_directory_async(
     max_files: int = 1000
 ) -> List[Path]:
     """Async directory scanning returning paths."""
-    reader = AsyncFileReader()
+    return await _get_default_reader().scan_directory(
+        directory, pattern,
+        processor=lambda p, c: p,
+        max_files=max_files
+    )
+
+
+def _call_safely(processor: Callable[[Any], Any], item: Any) -> Any:
+    """Run processor on one item, turning an exception into an error string."""
     try:
-        return await reader.scan_directory(
-            directory, pattern,
-            processor=lambda p, c: p,
-            max_files=max_files
-        )
-    finally:
-        reader.shutdown()
+        return processor(item)
+    except Exception as e:
+        return f"Error: {e}"
 
 
 class ParallelProcessor:
     """Process files in parallel with configurable workers."""
 
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, use_processes: bool = False, chunksize: int = 1):
         self.max_workers = max_workers
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.chunksize = chunksize
+        # Processes sidestep the GIL for CPU-heavy processors (which must then be picklable)
+        if use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
 
     def process(
         self,
@@ -149,20 +197,10 @@ class ParallelProcessor:
         processor: Callable[[Any], Any],
         description: str = "Processing"
     ) -> List[Any]:
-        """Process items in parallel."""
-        from concurrent.futures import as_completed
-
-        futures = {self._executor.submit(processor, item): item for item in items}
-        results = []
-
-        for future in as_completed(futures):
-            try:
-                result = future.result(timeout=30)
-                results.append(result)
-            except Exception as e:
-                results.append(f"Error: {e}")
-
-        return results
+        """Process items in parallel; results are returned in input order."""
+        return list(self._executor.map(
+            partial(_call_safely, processor), items, chunksize=self.chunksize
+        ))
 
     def shutdown(self):
         """Shutdown the executor."""
@@ -5,9 +5,221 @@ Manages autonomous decision-making thresholds and audit logging
 
 from dataclasses import dataclass
 from pathlib import Path
+import atexit
+import hashlib
 import json
+import os
+import threading
 from datetime import datetime
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_AUDIT_FLUSH_BYTES = 8192
+_AUDIT_FLUSH_SECONDS = 0.25
+_CHAIN_GENESIS = b"\0" * 32
+_TAIL_READ_BYTES = 65536
+
+
+def _dumps(obj) -> bytes:
+    """JSON-encode to bytes; uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _line_hash(line: bytes) -> bytes:
+    """Chain digest of one audit line (without its newline)"""
+    return hashlib.blake2b(line, digest_size=32).digest()
+
+
+def _last_line(path: Path) -> bytes:
+    """Last line of an existing log, or b"" if it is missing or empty"""
+    try:
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - _TAIL_READ_BYTES))
+            tail = f.read()
+    except FileNotFoundError:
+        return b""
+    return tail.rstrip(b"\n").rpartition(b"\n")[2]
+
+
+def _rechain(data: bytes, prev: bytes) -> Tuple[bytes, bytes]:
+    """Rewrite buffered lines' prev_hash to continue from prev; returns (lines, last hash)"""
+    out = bytearray()
+    for line in data.splitlines():
+        entry = json.loads(line)
+        entry["prev_hash"] = prev.hex()
+        line = _dumps(entry)
+        prev = _line_hash(line)
+        out += line
+        out += b"\n"
+    return bytes(out), prev
+
+
+class _AuditWriter:
+    """Buffered append-only writer shared by all audit logs.
+
+    Keeps one O_APPEND descriptor per log path and batches lines, flushing
+    a log once its buffer reaches _AUDIT_FLUSH_BYTES, or
+    _AUDIT_FLUSH_SECONDS after the first unflushed line. Each flush is a
+    single write() of whole lines; with O_APPEND the kernel places it at
+    end of file atomically, so several processes can share one log
+    without interleaving partial entries.
+
+    Every entry carries prev_hash, the BLAKE2b-256 of the previous line
+    in the same log (zeros for the first), so edits or deletions are
+    detectable with verify_audit_chain(). The chain resumes from the
+    file's last line when a log is reopened; processes writing one log
+    concurrently each keep their own chain.
+
+    Before each flush the descriptor is checked against the path. If the
+    log was rotated or deleted, it is reopened and the pending lines are
+    re-chained onto the new file's last line.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fds: Dict[Path, int] = {}
+        self._buffers: Dict[Path, bytearray] = {}
+        self._prev_hash: Dict[Path, bytes] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, path: Path, entry: Dict) -> None:
+        # One descriptor, buffer and chain per file, however the caller spells it
+        path = Path(os.path.abspath(path))
+        with self._lock:
+            buf = self._buffers.get(path)
+            if buf is None:
+                self._prev_hash[path] = self._open(path)
+                buf = self._buffers[path] = bytearray()
+            line = _dumps(dict(entry, prev_hash=self._prev_hash[path].hex()))
+            self._prev_hash[path] = _line_hash(line)
+            buf += line
+            buf += b"\n"
+            if len(buf) >= _AUDIT_FLUSH_BYTES:
+                self._flush(path)
+            elif self._timer is None:
+                self._timer = threading.Timer(_AUDIT_FLUSH_SECONDS, self.flush_all)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _open(self, path: Path) -> bytes:
+        """Open path for appending; returns the hash its chain continues from"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        last = _last_line(path)
+        self._fds[path] = os.open(
+            str(path),
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0),
+            0o644
+        )
+        return _line_hash(last) if last else _CHAIN_GENESIS
+
+    def _replaced(self, path: Path) -> bool:
+        """Whether path no longer names the file our descriptor has open"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return True
+        fst = os.fstat(self._fds[path])
+        return (st.st_dev, st.st_ino) != (fst.st_dev, fst.st_ino)
+
+    def _flush(self, path: Path) -> None:
+        """Write out one log's buffer (caller holds the lock)"""
+        buf = self._buffers[path]
+        if buf:
+            data = bytes(buf)
+            buf.clear()
+            if self._replaced(path):
+                # Rotated or deleted: writing to the old descriptor would
+                # go to an unlinked inode, and the pending lines are chained
+                # onto the old file's tail
+                os.close(self._fds[path])
+                data, self._prev_hash[path] = _rechain(data, self._open(path))
+            fd = self._fds[path]
+            while data:
+                data = data[os.write(fd, data):]
+
+    def flush_all(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for path in self._buffers:
+                self._flush(path)
+
+    def close(self) -> None:
+        """Flush everything and release the descriptors."""
+        self.flush_all()
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+            self._buffers.clear()
+            self._prev_hash.clear()
+
+
+_writer = _AuditWriter()
+
+
+def flush_audit_logs() -> None:
+    """Write any buffered audit entries to disk.
+
+    Runs automatically at interpreter exit; call it explicitly before
+    os._exit() (e.g. at the end of a multiprocessing worker), which
+    skips atexit handlers.
+    """
+    _writer.flush_all()
+
+
+atexit.register(_writer.close)
+
+
+def verify_audit_chain(log_path: Path) -> bool:
+    """Check that every line's prev_hash matches the line before it."""
+    prev = _CHAIN_GENESIS
+    with open(log_path, 'rb') as f:
+        for line in f:
+            line = line.rstrip(b"\n")
+            if not line:
+                continue
+            try:
+                recorded = json.loads(line).get("prev_hash")
+            except ValueError:
+                return False
+            if recorded != prev.hex():
+                return False
+            prev = _line_hash(line)
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _decide(confidence_threshold: float, auto_approve: bool,
+            confidence: float, is_destructive: bool) -> Tuple[bool, str]:
+    """Decision behind AutonomyConfig.should_auto_approve, memoized.
+
+    Keyed on the config fields as well as the inputs, so configs edited
+    after construction are still honoured.
+    """
+    # High confidence: always approve
+    if confidence >= confidence_threshold:
+        return True, f"High confidence ({confidence:.1%})"
+
+    # Low confidence + destructive: reject
+    if confidence < 0.5 and is_destructive:
+        return False, f"Low confidence ({confidence:.1%}) + destructive op"
+
+    # Manual override via --auto flag
+    if auto_approve:
+        return True, "Auto-approve flag enabled"
+
+    # Medium confidence: require manual approval
+    return False, f"Confidence {confidence:.1%} below threshold {confidence_threshold:.0%}"
 
 
 @dataclass
@@ -28,26 +240,16 @@ class AutonomyConfig:
         Returns:
             (should_proceed, reason) tuple
         """
-        # High confidence: always approve
-        if confidence >= self.confidence_threshold:
-            return True, f"High confidence ({confidence:.1%})"
-
-        # Low confidence + destructive: reject
-        if confidence < 0.5 and is_destructive:
-            return False, f"Low confidence ({confidence:.1%}) + destructive op"
-
-        # Manual override via --auto flag
-        if self.auto_approve:
-            return True, "Auto-approve flag enabled"
-
-        # Medium confidence: require manual approval
-        return False, f"Confidence {confidence:.1%} below threshold {self.confidence_threshold:.0%}"
+        return _decide(self.confidence_threshold, self.auto_approve,
+                       confidence, bool(is_destructive))
 
     def log_decision(self, log_path: Path, task_type: str, confidence: float,
                     approved: bool, reason: str) -> None:
         """
         Log autonomy decision to audit trail.
 
+        Entries are buffered; call flush_audit_logs() to force them to disk.
+
         Args:
             log_path: Path to audit log file
             task_type: Type of task being evaluated
@@ -55,8 +257,6 @@ class AutonomyConfig:
             approved: Whether task was approved
             reason: Reason for decision
         """
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-
         entry = {
             "timestamp": datetime.now().isoformat(),
             "task_type": task_type,
@@ -65,5 +265,4 @@ class AutonomyConfig:
             "reason": reason
         }
 
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry) + "\n")
+        _writer.write(log_path, entry)
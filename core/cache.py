@@ -5,12 +5,68 @@ Provides caching utilities for prompts, results, and file hashes.
 """
 
 import hashlib
+import heapq
 import json
+import mmap
+import os
+import stat
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_HASH_CHUNK = 1 << 16  # 64 KiB, a whole number of BLAKE2b blocks
+_RACY_WINDOW_NS = 2_000_000_000  # coarsest common mtime granularity (FAT: 2s)
+_PURGE_EVERY_SETS = 128
+# hash_many thread cap: enough to overlap disk I/O, well under fd limits
+_HASH_MAX_WORKERS = 32
+
+
+def _dumps_sorted(obj: Any) -> bytes:
+    """Canonical JSON bytes (sorted keys); uses orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # e.g. non-str keys or ints past 64 bits; stdlib handles these
+    return json.dumps(obj, sort_keys=True).encode()
+
+
+def _hash_file(path: Path) -> str:
+    """BLAKE2b-128 of a file; large files are mapped and hashed in chunks."""
+    hasher = hashlib.blake2b(digest_size=16)
+    fd = os.open(str(path), os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size < _HASH_CHUNK:
+            # Small files: a single read is cheaper than setting up a mapping
+            hasher.update(os.read(fd, _HASH_CHUNK))
+            return hasher.hexdigest()
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(view), _HASH_CHUNK):
+                    hasher.update(view[offset:offset + _HASH_CHUNK])
+            finally:
+                view.release()
+        return hasher.hexdigest()
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=1024)
+def _prompt_key(agent_id: str, skill_ids: Tuple[str, ...]) -> str:
+    """Canonical prompt cache key; memoized since the same combos repeat."""
+    return f"{agent_id}:{':'.join(sorted(skill_ids))}"
+
 
 @dataclass
 class CacheEntry:
@@ -18,6 +74,7 @@ class CacheEntry:
     value: Any
     timestamp: float
     ttl: float
+    files: Tuple[str, ...] = ()
 
     def is_expired(self) -> bool:
         return time.time() - self.timestamp > self.ttl
@@ -27,30 +84,32 @@ class PromptCache:
     """Cache for static prompt components with LRU eviction."""
 
     def __init__(self, max_size: int = 50):
-        self._cache: Dict[str, str] = {}
+        self._cache: "OrderedDict[str, str]" = OrderedDict()  # least recently used first
         self._hits = 0
         self._misses = 0
         self.max_size = max_size
 
-    def get_key(self, agent_id: str, skill_ids: tuple) -> str:
-        """Generate cache key from agent + skills."""
-        return f"{agent_id}:{':'.join(sorted(skill_ids))}"
+    def get_key(self, agent_id: str, skill_ids: Tuple[str, ...]) -> str:
+        """Generate cache key from agent + skills (in any order)."""
+        return _prompt_key(agent_id, tuple(skill_ids))
 
     def get(self, key: str) -> Optional[str]:
         """Get cached prompt. Returns None if not found."""
         result = self._cache.get(key)
         if result:
             self._hits += 1
+            self._cache.move_to_end(key)
         else:
             self._misses += 1
         return result
 
     def set(self, key: str, value: str) -> None:
         """Set cached prompt with LRU eviction."""
-        if len(self._cache) >= self.max_size:
-            # Remove oldest entry (first key in dict)
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self.max_size:
+            # Remove least recently used entry
+            self._cache.popitem(last=False)
         self._cache[key] = value
 
     def clear(self) -> None:
@@ -76,12 +135,17 @@ class ResultCache:
 
     def __init__(self, default_ttl: float = 30.0):
         self._cache: Dict[str, CacheEntry] = {}
+        self._by_file: Dict[str, Set[str]] = {}  # file path -> cache keys
+        self._expiry: List[Tuple[float, str]] = []  # heap of (expires_at, key)
+        self._sets = 0
         self.default_ttl = default_ttl
 
     def _hash_key(self, operation: str, *args) -> str:
         """Generate hash-based cache key."""
-        content = f"{operation}:{json.dumps(args, sort_keys=True)}"
-        return hashlib.md5(content.encode()).hexdigest()
+        hasher = hashlib.blake2b(operation.encode(), digest_size=16)
+        hasher.update(b":")
+        hasher.update(_dumps_sorted(args))
+        return hasher.hexdigest()
 
     def get(self, operation: str, *args) -> Optional[Any]:
         """Get cached result. Returns None if not found or expired."""
@@ -90,34 +154,73 @@ class ResultCache:
         if entry and not entry.is_expired():
             return entry.value
         if entry:
-            del self._cache[key]  # Clean expired
+            self._discard(key)  # Clean expired
         return None
 
-    def set(self, operation: str, result: Any, *args, ttl: float = None) -> None:
-        """Set cached result with optional TTL."""
+    def set(self, operation: str, result: Any, *args, ttl: float = None,
+            files: Iterable[str] = ()) -> None:
+        """Set cached result with optional TTL.
+
+        files lists the paths the result depends on; invalidate_by_file()
+        on any of them drops the entry.
+        """
         key = self._hash_key(operation, *args)
-        self._cache[key] = CacheEntry(
+        if key in self._cache:
+            self._discard(key)
+        files = tuple(str(f) for f in files)
+        entry = CacheEntry(
             value=result,
             timestamp=time.time(),
-            ttl=ttl or self.default_ttl
+            ttl=ttl or self.default_ttl,
+            files=files
         )
+        self._cache[key] = entry
+        for file_path in files:
+            self._by_file.setdefault(file_path, set()).add(key)
+        heapq.heappush(self._expiry, (entry.timestamp + entry.ttl, key))
+
+        # Sweep every N writes rather than per entry or on a timer
+        self._sets += 1
+        if self._sets % _PURGE_EVERY_SETS == 0:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Drop entries whose TTL has passed. Returns number removed."""
+        now = time.time()
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._cache.get(key)
+            # Skip stale heap records left by overwritten or removed entries
+            if entry is not None and entry.timestamp + entry.ttl == expires_at:
+                self._discard(key)
+                removed += 1
+        return removed
+
+    def _discard(self, key: str) -> None:
+        """Remove an entry and its file index references."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        for file_path in entry.files:
+            keys = self._by_file.get(file_path)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_file[file_path]
 
     def invalidate_by_file(self, file_path: str) -> int:
-        """Invalidate all entries related to a file."""
-        count = 0
-        keys_to_remove = []
-        file_path_str = str(file_path)
-        for key, entry in self._cache.items():
-            if file_path_str in str(entry.value):
-                keys_to_remove.append(key)
-        for key in keys_to_remove:
-            del self._cache[key]
-            count += 1
-        return count
+        """Invalidate all entries that were set with this file in files."""
+        keys = self._by_file.pop(str(file_path), ())
+        for key in keys:
+            self._discard(key)
+        return len(keys)
 
     def clear(self) -> None:
         """Clear all cached results."""
         self._cache.clear()
+        self._by_file.clear()
+        self._expiry.clear()
 
     @property
     def size(self) -> int:
@@ -128,18 +231,54 @@ class ResultCache:
 class FileHashCache:
     """Track file hashes for change detection."""
 
-    def __init__(self):
+    def __init__(self, strong: bool = False):
         self._hashes: Dict[str, str] = {}
+        # path -> (st_mtime_ns, st_size, hash, time hashed in ns)
+        self._stat: Dict[str, Tuple[int, int, str, int]] = {}
+        self.strong = strong  # always re-hash, never trust the stat fast path
 
     def get_hash(self, path: Path) -> str:
-        """Get MD5 hash of file content."""
-        if not path.exists() or not path.is_file():
+        """Get 128-bit BLAKE2b hash of file content.
+
+        Unless strong, a file whose (mtime, size) is unchanged since it was
+        last hashed returns the cached hash without being read. Files
+        modified within _RACY_WINDOW_NS of that hash are always re-read,
+        since a same-size rewrite could share their timestamp.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return ""
+        if not stat.S_ISREG(st.st_mode):
             return ""
+
+        path_str = str(path)
+        cached = self._stat.get(path_str)
+        if (not self.strong and cached and cached[:2] == (st.st_mtime_ns, st.st_size)
+                and st.st_mtime_ns < cached[3] - _RACY_WINDOW_NS):
+            return cached[2]
+
+        hashed_at = time.time_ns()
         try:
-            content = path.read_bytes()
-            return hashlib.md5(content).hexdigest()
-        except (IOError, OSError):
+            digest = _hash_file(path)
+        except (IOError, OSError, ValueError):
             return ""
+        self._stat[path_str] = (st.st_mtime_ns, st.st_size, digest, hashed_at)
+        return digest
+
+    def hash_many(self, paths: Iterable[Path]) -> Dict[str, str]:
+        """Hash many files on a thread pool; returns {str(path): hash}.
+
+        Reads and BLAKE2b updates release the GIL, so cold files hash in
+        parallel; files unchanged since they were last hashed still take
+        the stat fast path and do no I/O.
+        """
+        paths = list(paths)
+        if len(paths) <= 1:
+            return {str(p): self.get_hash(p) for p in paths}
+        workers = min(len(paths), (os.cpu_count() or 1) * 4, _HASH_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(map(str, paths), pool.map(self.get_hash, paths)))
 
     def has_changed(self, path: Path) -> bool:
         """Check if file has changed since last check."""
@@ -156,6 +295,7 @@ class FileHashCache:
     def clear(self) -> None:
         """Clear all tracked file hashes."""
         self._hashes.clear()
+        self._stat.clear()
 
 
 # Singleton caches for global access
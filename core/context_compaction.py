@@ -3,6 +3,7 @@ Context Compaction Utilities
 Manage token budgets and context size for agent handoff
 """
 
+from collections import deque
 from typing import Dict, List, Any
 import json
 
@@ -11,6 +12,10 @@ def compact_context(context: Dict[str, Any], max_tokens: int = 4000) -> Dict[str
     """
     Compact context to fit within token budget
 
+    Walks nested dicts breadth-first with one character budget shared by
+    every string in the context, so shallow fields are kept first. Once
+    the budget is spent, the rest of each dict is cut off with a marker.
+
     Args:
         context: Original context dictionary
         max_tokens: Maximum tokens (approximate)
@@ -19,29 +24,43 @@ def compact_context(context: Dict[str, Any], max_tokens: int = 4000) -> Dict[str
         Compacted context
     """
     # Rough estimate: 1 token ≈ 4 characters
-    max_chars = max_tokens * 4
+    remaining = max_tokens * 4
 
     compacted = {}
-
-    for key, value in context.items():
-        if isinstance(value, str):
-            # String values - truncate if too long
-            if len(value) > max_chars:
-                compacted[key] = value[:max_chars] + f"\n... [truncated {len(value) - max_chars} chars]"
-            else:
-                compacted[key] = value
-        elif isinstance(value, dict):
-            # Nested dict - compact recursively
-            compacted[key] = compact_context(value, max_tokens // 2)
-        elif isinstance(value, list):
-            # List - keep first few items if too many
-            if len(value) > 10:
-                compacted[key] = value[:5] + [f"... ({len(value) - 5} more items)"]
+    # Shared (or cyclic) dicts map to the same compacted dict
+    seen = {id(context): compacted}
+    queue = deque([(context, compacted)])
+
+    while queue:
+        source, target = queue.popleft()
+        for key, value in source.items():
+            if remaining <= 0:
+                target[key] = "... [budget exhausted]"
+                break
+            if isinstance(value, str):
+                # String values - truncate if too long
+                if len(value) > remaining:
+                    target[key] = value[:remaining] + f"\n... [truncated {len(value) - remaining} chars]"
+                    remaining = 0
+                else:
+                    target[key] = value
+                    remaining -= len(value)
+            elif isinstance(value, dict):
+                # Nested dict - compact when its turn in the queue comes
+                child = seen.get(id(value))
+                if child is None:
+                    child = seen[id(value)] = {}
+                    queue.append((value, child))
+                target[key] = child
+            elif isinstance(value, list):
+                # List - keep first few items if too many
+                if len(value) > 10:
+                    target[key] = value[:5] + [f"... ({len(value) - 5} more items)"]
+                else:
+                    target[key] = value
             else:
-                compacted[key] = value
-        else:
-            # Other types - keep as is
-            compacted[key] = value
+                # Other types - keep as is
+                target[key] = value
 
     return compacted
 
@@ -71,9 +90,33 @@ def summarize_messages(messages: List[Dict[str, Any]], max_messages: int = 5) ->
     return kept
 
 
+_encoder = None
+_encoder_loaded = False
+
+# Below this length the len // 4 heuristic is cheaper than encoding
+_EXACT_MIN_CHARS = 400
+
+
+def _get_encoder():
+    """cl100k_base tiktoken encoder, or None if unavailable (loaded once)."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Not installed, or the encoding data can't be fetched offline
+            _encoder = None
+    return _encoder
+
+
 def estimate_tokens(text: str) -> int:
     """
-    Rough token estimation
+    Token estimation
+
+    Uses tiktoken's cl100k_base encoding when it is installed; short
+    strings and installs without tiktoken fall back to ~4 chars per token.
 
     Args:
         text: Input text
@@ -81,4 +124,8 @@ def estimate_tokens(text: str) -> int:
     Returns:
         Estimated token count
     """
+    if len(text) >= _EXACT_MIN_CHARS:
+        encoder = _get_encoder()
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
     return len(text) // 4
@@ -30,6 +30,8 @@ class ErrorDiagnosis:
     suggested_fix: str
 
 class Diagnostician:
+    _DECODER = json.JSONDecoder()
+
     def __init__(self, ai_provider: GeminiProvider):
         self.ai_provider = ai_provider
 
@@ -64,15 +66,12 @@ class Diagnostician:
         
         try:
             response = self.ai_provider.generate(prompt)
-            # Robust cleanup: find the first { and last }
+            # Decode the first complete JSON object, ignoring any fences or
+            # trailing text around it
             start = response.find("{")
-            end = response.rfind("}") + 1
-            
-            if start != -1 and end != 0:
-                cleaned_response = response[start:end]
-                data = json.loads(cleaned_response)
-            else:
+            if start == -1:
                 raise ValueError("No JSON object found in response")
+            data, _ = self._DECODER.raw_decode(response, start)
             
             return ErrorDiagnosis(
                 error_type=ErrorType(data.get("error_type", "UNKNOWN")),
@@ -3,6 +3,7 @@ Intent Parser & Command Router
 Maps user requests to appropriate agent pipelines
 """
 
+import re
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
@@ -26,6 +27,86 @@ class TaskType(Enum):
     STATUS = "status"
 
 
+# Task-to-agent mapping
+_PIPELINES: Dict[TaskType, Tuple[str, ...]] = {
+    TaskType.SCAN_PROJECT: ("00",),  # Agent 00 only
+    TaskType.LEARN_PATTERNS: ("00",),  # Agent 00 only
+    TaskType.SECURITY_AUDIT: ("00",),  # Agent 00 only
+
+    TaskType.BUILD_FEATURE: (
+        "00",  # Forensic - analyze existing code
+        "01",  # Architect - design feature
+        "02",  # Builder - implement (with scaffolding)
+        "03",  # Designer - UI/UX
+        "04",  # Reviewer - code review
+        "05",  # Integrator - write files
+        "08",  # Shipper - verify build & npm install
+        "09"   # Tester - run tests
+    ),
+
+    TaskType.FIX_BUG: (
+        "07",  # Medic - diagnose & fix
+        "09"   # Tester - verify fix
+    ),
+
+    TaskType.DESIGN_UI: (
+        "03",  # Designer - create UI
+        "04",  # Reviewer - review
+        "05"   # Integrator - write files
+    ),
+
+    TaskType.RUN_TESTS: (
+        "09",  # Tester only
+    ),
+
+    TaskType.ADD_TESTS: (
+        "09",  # Tester - generate tests for existing code
+    ),
+
+    TaskType.SHIP_RELEASE: (
+        "08",  # Shipper - prepare release
+        "09"   # Tester - final validation
+    ),
+
+    TaskType.REFACTOR_CODE: (
+        "00",  # Forensic - analyze current code
+        "02",  # Builder - refactor
+        "04",  # Reviewer - ensure behavior preserved
+        "09",  # Tester - verify tests still pass
+        "05"   # Integrator - write changes
+    ),
+
+    TaskType.OPTIMIZE_PERFORMANCE: (
+        "00",  # Forensic - profile & analyze
+        "01",  # Architect - optimization strategy
+        "02",  # Builder - implement optimizations
+        "09"   # Tester - performance tests
+    ),
+
+    TaskType.UPDATE_DEPENDENCIES: (
+        "00",  # Forensic - impact analysis
+        "01",  # Architect - migration plan
+        "09"   # Tester - verify compatibility
+    ),
+}
+
+# Task types that skip the forced Agent 00 pass on existing projects
+_NO_FORENSIC = frozenset({
+    TaskType.SCAN_PROJECT,
+    TaskType.LEARN_PATTERNS,
+    TaskType.RUN_TESTS,
+    TaskType.STATUS,
+    TaskType.CONFIG,
+})
+
+_REQUIRES_APPROVAL = frozenset({
+    TaskType.BUILD_FEATURE,
+    TaskType.REFACTOR_CODE,
+    TaskType.UPDATE_DEPENDENCIES,
+    TaskType.SHIP_RELEASE,
+})
+
+
 class IntentParser:
     """
     Parses user input and determines which agents to activate
@@ -33,38 +114,38 @@ class IntentParser:
     """
     
     def __init__(self):
-        # Command patterns for explicit commands
-        self.command_patterns = {
+        # Explicit commands, keyed by the first token of the input
+        self._cmd_dispatch = {
             # Discovery commands
-            r'^/scan': TaskType.SCAN_PROJECT,
-            r'^/learn': TaskType.LEARN_PATTERNS,
-            r'^/audit': TaskType.SECURITY_AUDIT,
+            '/scan': TaskType.SCAN_PROJECT,
+            '/learn': TaskType.LEARN_PATTERNS,
+            '/audit': TaskType.SECURITY_AUDIT,
             
             # Development commands
-            r'^/build': TaskType.BUILD_FEATURE,
-            r'^/feature': TaskType.BUILD_FEATURE,
-            r'^/fix': TaskType.FIX_BUG,
-            r'^/bug': TaskType.FIX_BUG,
-            r'^/refactor': TaskType.REFACTOR_CODE,
-            r'^/optimize': TaskType.OPTIMIZE_PERFORMANCE,
+            '/build': TaskType.BUILD_FEATURE,
+            '/feature': TaskType.BUILD_FEATURE,
+            '/fix': TaskType.FIX_BUG,
+            '/bug': TaskType.FIX_BUG,
+            '/refactor': TaskType.REFACTOR_CODE,
+            '/optimize': TaskType.OPTIMIZE_PERFORMANCE,
             
             # Design commands
-            r'^/design': TaskType.DESIGN_UI,
-            r'^/vibe': TaskType.DESIGN_UI,
-            r'^/ui': TaskType.DESIGN_UI,
+            '/design': TaskType.DESIGN_UI,
+            '/vibe': TaskType.DESIGN_UI,
+            '/ui': TaskType.DESIGN_UI,
             
             # Testing commands
-            r'^/test': TaskType.RUN_TESTS,
-            r'^/test-legacy': TaskType.ADD_TESTS,
-            r'^/coverage': TaskType.RUN_TESTS,
+            '/test': TaskType.RUN_TESTS,
+            '/test-legacy': TaskType.ADD_TESTS,
+            '/coverage': TaskType.RUN_TESTS,
             
             # Release commands
-            r'^/ship': TaskType.SHIP_RELEASE,
-            r'^/release': TaskType.SHIP_RELEASE,
+            '/ship': TaskType.SHIP_RELEASE,
+            '/release': TaskType.SHIP_RELEASE,
             
             # System commands
-            r'^/status': TaskType.STATUS,
-            r'^/config': TaskType.CONFIG,
+            '/status': TaskType.STATUS,
+            '/config': TaskType.CONFIG,
         }
         
         # Natural language keywords
@@ -97,6 +178,21 @@ class IntentParser:
             # Questions
             ('what', 'how', 'why', 'explain', 'show me', '?'): TaskType.QUESTION,
         }
+        
+        # One alternation over every keyword, anchored at the start of a
+        # word so suffixes still match ("tests", "styling") but "ui" inside
+        # "build" does not. The lookahead lets overlapping keywords such as
+        # "unit test" and "test" both be found in a single scan.
+        self._kw_to_task = {
+            keyword: task_type
+            for keywords, task_type in self.keyword_patterns.items()
+            for keyword in keywords
+        }
+        self._task_order = list(self.keyword_patterns.values())
+        self._kw_re = re.compile('(?=(' + '|'.join(
+            (r'\b' if kw[0].isalnum() else '') + re.escape(kw)
+            for kw in sorted(self._kw_to_task, key=len, reverse=True)
+        ) + '))')
     
     def parse(self, user_input: str) -> Tuple[TaskType, Dict]:
         """
@@ -120,30 +216,29 @@ class IntentParser:
     
     def _parse_command(self, text: str) -> Tuple[Optional[TaskType], Dict]:
         """Parse explicit commands like /scan, /build, etc."""
-        import re
+        if not text.startswith('/'):
+            return None, {}
         
-        for pattern, task_type in self.command_patterns.items():
-            if re.match(pattern, text, re.IGNORECASE):
-                # Extract parameters
-                params = self._extract_params(text, task_type)
-                return task_type, params
+        task_type = self._cmd_dispatch.get(text.split(maxsplit=1)[0].lower())
+        if task_type is None:
+            return None, {}
         
-        return None, {}
+        # Extract parameters
+        return task_type, self._extract_params(text, task_type)
     
     def _parse_natural_language(self, text: str) -> Tuple[TaskType, Dict]:
         """Parse natural language requests"""
         text_lower = text.lower()
         
-        # Score each task type
+        # Score each task type by the distinct keywords found in one pass
         scores = {}
-        for keywords, task_type in self.keyword_patterns.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                scores[task_type] = score
+        for keyword in set(self._kw_re.findall(text_lower)):
+            task_type = self._kw_to_task[keyword]
+            scores[task_type] = scores.get(task_type, 0) + 1
         
-        # Return highest scoring task type
+        # Return highest scoring task type (ties go to the earlier group)
         if scores:
-            best_task = max(scores, key=scores.get)
+            best_task = max(self._task_order, key=lambda t: scores.get(t, 0))
             params = {
                 'description': text,
                 'confidence': scores[best_task] / len(text_lower.split())
@@ -184,93 +279,17 @@ class IntentParser:
             List of agent IDs to execute in order
         """
         
-        # Task-to-agent mapping
-        pipelines = {
-            TaskType.SCAN_PROJECT: ["00"],  # Agent 00 only
-            TaskType.LEARN_PATTERNS: ["00"],  # Agent 00 only
-            TaskType.SECURITY_AUDIT: ["00"],  # Agent 00 only
-            
-            TaskType.BUILD_FEATURE: [
-                "00",  # Forensic - analyze existing code
-                "01",  # Architect - design feature
-                "02",  # Builder - implement (with scaffolding)
-                "03",  # Designer - UI/UX
-                "04",  # Reviewer - code review
-                "05",  # Integrator - write files
-                "08",  # Shipper - verify build & npm install
-                "09"   # Tester - run tests
-            ],
-            
-            TaskType.FIX_BUG: [
-                "07",  # Medic - diagnose & fix
-                "09"   # Tester - verify fix
-            ],
-            
-            TaskType.DESIGN_UI: [
-                "03",  # Designer - create UI
-                "04",  # Reviewer - review
-                "05"   # Integrator - write files
-            ],
-            
-            TaskType.RUN_TESTS: [
-                "09"   # Tester only
-            ],
-            
-            TaskType.ADD_TESTS: [
-                "09"   # Tester - generate tests for existing code
-            ],
-            
-            TaskType.SHIP_RELEASE: [
-                "08",  # Shipper - prepare release
-                "09"   # Tester - final validation
-            ],
-            
-            TaskType.REFACTOR_CODE: [
-                "00",  # Forensic - analyze current code
-                "02",  # Builder - refactor
-                "04",  # Reviewer - ensure behavior preserved
-                "09",  # Tester - verify tests still pass
-                "05"   # Integrator - write changes
-            ],
-            
-            TaskType.OPTIMIZE_PERFORMANCE: [
-                "00",  # Forensic - profile & analyze
-                "01",  # Architect - optimization strategy
-                "02",  # Builder - implement optimizations
-                "09"   # Tester - performance tests
-            ],
-            
-            TaskType.UPDATE_DEPENDENCIES: [
-                "00",  # Forensic - impact analysis
-                "01",  # Architect - migration plan
-                "09"   # Tester - verify compatibility
-            ],
-        }
-        
-        pipeline = pipelines.get(task_type, [])
+        pipeline = _PIPELINES.get(task_type, ())
         
         # For existing projects, ALWAYS start with Agent 00 (unless it's a simple command)
-        if is_existing_project and task_type not in [
-            TaskType.SCAN_PROJECT, 
-            TaskType.LEARN_PATTERNS,
-            TaskType.RUN_TESTS,
-            TaskType.STATUS,
-            TaskType.CONFIG
-        ]:
-            if "00" not in pipeline:
-                pipeline.insert(0, "00")
+        if is_existing_project and task_type not in _NO_FORENSIC and "00" not in pipeline:
+            pipeline = ("00",) + pipeline
         
-        return pipeline
+        return list(pipeline)
     
     def should_ask_for_approval(self, task_type: TaskType) -> bool:
         """Determine if user approval required before execution"""
-        requires_approval = [
-            TaskType.BUILD_FEATURE,
-            TaskType.REFACTOR_CODE,
-            TaskType.UPDATE_DEPENDENCIES,
-            TaskType.SHIP_RELEASE
-        ]
-        return task_type in requires_approval
+        return task_type in _REQUIRES_APPROVAL
 
 
 # Example usage
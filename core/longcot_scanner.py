@@ -17,13 +17,111 @@ Based on research from:
 
 import os
 import json
+import re
+import time
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional, Any, Set
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_READ_CHUNK = 1 << 20  # 1 MiB
+_WRITE_BUFFER = 1 << 20  # report files: fewer, larger write() calls
+CODE_SUFFIXES = frozenset({'.py', '.js', '.ts', '.java', '.cpp', '.c'})
+# Module named by each import line: "from pkg.mod import x" -> pkg.mod,
+# "import pkg.mod" -> pkg.mod; run over raw bytes, no decode needed
+_IMPORT_RE = re.compile(rb'(?m)^\s*(?:from\s+([\w.]+)|import\s+([\w.]+))')
+
+# Per-file scan cache (.vibecode/longcot/file_cache.json); bump the version
+# whenever _scan_code_file's output changes
+_FILE_CACHE_VERSION = 2
+# Files modified this close to their last scan are re-read: a same-size
+# rewrite within one mtime tick would otherwise look unchanged
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _dump_report(results: Dict) -> bytes:
+    """Compact JSON for the machine-readable report; uses orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(results, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(results, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _count_lines(path: Path) -> int:
+    """Count lines by streaming bytes; no decode, no list of lines"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb', buffering=0) as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    # A final line without a trailing newline still counts, as with splitlines()
+    return lines if last == b'\n' else lines + 1
+
+
+def _walk_files(root: Path, skip_dirs: Set[str]):
+    """Yield os.DirEntry for every file under root, depth-first
+
+    Uses the file type from readdir (no extra stat per entry), does not
+    follow directory symlinks, and never descends into directories whose
+    name is in skip_dirs.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        subdirs.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+            except OSError:
+                continue
+        # Reversed so directories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _scan_code_file(path: Path) -> Tuple[int, Set[str]]:
+    """Line count and, for .py files, imports -- from a single read"""
+    if path.suffix != '.py':
+        return _count_lines(path), set()
+    data = path.read_bytes()
+    lines = data.count(b'\n')
+    if data and not data.endswith(b'\n'):
+        lines += 1
+    imports = set()
+    for match in _IMPORT_RE.finditer(data):
+        module = (match.group(1) or match.group(2)).split(b'.', 1)[0]
+        # Relative imports leave an empty name; skip private modules too
+        if module and not module.startswith(b'_'):
+            imports.add(module.decode('ascii'))
+    return lines, imports
+
+
+def _try_scan_code_file(path: Path) -> Optional[Tuple[int, Set[str]]]:
+    """_scan_code_file for pool workers: None if the file can't be read"""
+    try:
+        return _scan_code_file(path)
+    except OSError:
+        return None
+
 
 class ReasoningState(Enum):
     """States in the reasoning tree"""
@@ -92,6 +190,18 @@ class LongCoTScanner:
             '.pytest_cache', 'htmlcov', '.tox', 'eggs', '.eggs'
         }
         
+        # File reads release the GIL; overlap them on threads
+        self.max_scan_workers = min(32, (os.cpu_count() or 1) * 4)
+        
+        # path -> [mtime_ns, size, scanned_at_ns, lines, imports]
+        self._file_cache_path = self.longcot_dir / "file_cache.json"
+        self._file_cache = self._load_file_cache()
+        self._file_cache_seen: Set[str] = set()
+        
+        # Report files are written off the scan thread (see close())
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_reports: List[Future] = []
+        
         # ToT reasoning state
         self.root_node: Optional[ReasoningNode] = None
         self.current_chain = ReasoningChain()
@@ -144,6 +254,7 @@ class LongCoTScanner:
         
         # Save with reasoning traces
         self._save_longcot_reports(results)
+        self._save_file_cache()
         
         print("\n" + "=" * 60)
         print("✅ Long CoT Analysis Complete!")
@@ -217,17 +328,19 @@ class LongCoTScanner:
         possible interpretations of the codebase structure
         """
         hypotheses = []
+        # One pass over the items; every indicator below is a set lookup
+        names = {item.name for item in items}
         
         # Hypothesis 1: Multi-agent system
-        if any(item.name in ['agents', 'core', 'skills'] for item in items):
+        if not names.isdisjoint(('agents', 'core', 'skills')):
             hypotheses.append({
                 'type': 'multi_agent_system',
                 'description': 'Multi-agent AI system with orchestration',
                 'confidence': 0.85,
                 'indicators': {
-                    'agents_dir': any(item.name == 'agents' for item in items),
-                    'core_dir': any(item.name == 'core' for item in items),
-                    'skills_dir': any(item.name == 'skills' for item in items)
+                    'agents_dir': 'agents' in names,
+                    'core_dir': 'core' in names,
+                    'skills_dir': 'skills' in names
                 },
                 'reasoning': [
                     'Detected agents directory → likely multi-agent architecture',
@@ -237,14 +350,14 @@ class LongCoTScanner:
             })
         
         # Hypothesis 2: Full-stack web application
-        if any(item.name in ['frontend', 'backend', 'api', 'client', 'server'] for item in items):
+        if not names.isdisjoint(('frontend', 'backend', 'api', 'client', 'server')):
             hypotheses.append({
                 'type': 'fullstack_web_app',
                 'description': 'Full-stack web application with separated layers',
                 'confidence': 0.75,
                 'indicators': {
-                    'frontend': any(item.name in ['frontend', 'client', 'web'] for item in items),
-                    'backend': any(item.name in ['backend', 'api', 'server'] for item in items)
+                    'frontend': not names.isdisjoint(('frontend', 'client', 'web')),
+                    'backend': not names.isdisjoint(('backend', 'api', 'server'))
                 },
                 'reasoning': [
                     'Frontend/backend separation detected',
@@ -253,7 +366,7 @@ class LongCoTScanner:
             })
         
         # Hypothesis 3: Microservices architecture
-        service_dirs = [item for item in items if item.is_dir() and 'service' in item.name.lower()]
+        service_dirs = [item for item in items if 'service' in item.name.lower() and item.is_dir()]
         if len(service_dirs) > 1:
             hypotheses.append({
                 'type': 'microservices',
@@ -286,14 +399,14 @@ class LongCoTScanner:
             })
         
         # Hypothesis 5: Python package/library
-        if any(item.name in ['setup.py', 'pyproject.toml'] for item in items):
+        if not names.isdisjoint(('setup.py', 'pyproject.toml')):
             hypotheses.append({
                 'type': 'python_package',
                 'description': 'Python package or library',
                 'confidence': 0.80,
                 'indicators': {
-                    'setup_py': any(item.name == 'setup.py' for item in items),
-                    'pyproject': any(item.name == 'pyproject.toml' for item in items)
+                    'setup_py': 'setup.py' in names,
+                    'pyproject': 'pyproject.toml' in names
                 },
                 'reasoning': [
                     'Python package configuration files detected',
@@ -426,11 +539,8 @@ class LongCoTScanner:
             # Generate hypotheses about module purpose
             module_hypotheses = self._generate_module_hypotheses(dir_path)
             
-            # Analyze files in module
-            file_analysis = self._analyze_module_files(dir_path)
-            
-            # Map dependencies
-            dependencies = self._map_module_dependencies(dir_path, file_analysis)
+            # Analyze files and map dependencies in one pass over the module
+            file_analysis, dependencies = self._scan_module(dir_path)
             
             modules[dir_name] = {
                 'path': str(dir_path),
@@ -447,10 +557,9 @@ class LongCoTScanner:
     def _generate_module_hypotheses(self, module_path: Path) -> List[Dict]:
         """Generate hypotheses about what a module does"""
         hypotheses = []
-        files = list(module_path.rglob('*.py'))
-        
         # Look for patterns in filenames
-        file_names = [f.name for f in files]
+        file_names = [entry.name for entry in _walk_files(module_path, self.ignore_dirs)
+                      if entry.name.endswith('.py')]
         
         # Hypothesis: API/Service module
         if any('api' in name or 'service' in name for name in file_names):
@@ -486,8 +595,12 @@ class LongCoTScanner:
         
         return sorted(hypotheses, key=lambda h: h['confidence'], reverse=True)
     
-    def _analyze_module_files(self, module_path: Path) -> Dict:
-        """Analyze files in a module"""
+    def _scan_module(self, module_path: Path) -> Tuple[Dict, List[str]]:
+        """Analyze files in a module and map its dependencies
+
+        Walks the module once and reads each code file once: line counts
+        and (for Python files) import dependencies come from the same read.
+        """
         analysis = {
             'total_files': 0,
             'total_lines': 0,
@@ -495,26 +608,34 @@ class LongCoTScanner:
             'key_files': [],
             'complexity_estimate': 'low'
         }
+        dependencies = set()
         
-        for file_path in module_path.rglob('*'):
-            if file_path.is_file() and not any(ignore in str(file_path) for ignore in self.ignore_dirs):
-                analysis['total_files'] += 1
-                analysis['file_types'][file_path.suffix] += 1
+        # Walk first (ignored directories are pruned by the walker); code
+        # files are read afterwards on a thread pool
+        counted = []
+        for entry in _walk_files(module_path, self.ignore_dirs):
+            file_path = Path(entry.path)
+            analysis['total_files'] += 1
+            analysis['file_types'][file_path.suffix] += 1
+            
+            # Count lines for code files
+            if file_path.suffix in CODE_SUFFIXES:
+                counted.append(file_path)
+        
+        with ThreadPoolExecutor(max_workers=self.max_scan_workers) as pool:
+            for file_path, result in zip(counted, pool.map(self._scan_cached, counted)):
+                if result is None:
+                    continue
+                lines, imports = result
+                analysis['total_lines'] += lines
+                dependencies.update(imports)
                 
-                # Count lines for code files
-                if file_path.suffix in ['.py', '.js', '.ts', '.java', '.cpp', '.c']:
-                    try:
-                        lines = len(file_path.read_text(encoding='utf-8').splitlines())
-                        analysis['total_lines'] += lines
-                        
-                        # Track key files (>100 lines)
-                        if lines > 100:
-                            analysis['key_files'].append({
-                                'path': str(file_path.relative_to(self.project_path)),
-                                'lines': lines
-                            })
-                    except:
-                        pass
+                # Track key files (>100 lines)
+                if lines > 100:
+                    analysis['key_files'].append({
+                        'path': str(file_path.relative_to(self.project_path)),
+                        'lines': lines
+                    })
         
         # Estimate complexity
         if analysis['total_lines'] > 5000:
@@ -522,30 +643,49 @@ class LongCoTScanner:
         elif analysis['total_lines'] > 1000:
             analysis['complexity_estimate'] = 'medium'
         
-        return analysis
+        return analysis, sorted(dependencies)
     
-    def _map_module_dependencies(self, module_path: Path, file_analysis: Dict) -> List[str]:
-        """Map dependencies between modules"""
-        dependencies = set()
-        
-        # Look at imports in Python files
-        for file_path in module_path.rglob('*.py'):
-            try:
-                content = file_path.read_text(encoding='utf-8')
-                # Simple import detection
-                for line in content.splitlines():
-                    if line.strip().startswith('from ') or line.strip().startswith('import '):
-                        # Extract module name
-                        if 'import ' in line:
-                            parts = line.split('import ')
-                            if len(parts) > 1:
-                                module = parts[1].split()[0].split('.')[0]
-                                if module and not module.startswith('_'):
-                                    dependencies.add(module)
-            except:
-                pass
-        
-        return sorted(list(dependencies))
+    def _scan_cached(self, path: Path) -> Optional[Tuple[int, Set[str]]]:
+        """_scan_code_file, skipping the read if (mtime, size) is unchanged"""
+        key = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        self._file_cache_seen.add(key)
+        cached = self._file_cache.get(key)
+        if (cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size
+                and st.st_mtime_ns < cached[2] - _RACY_WINDOW_NS):
+            return cached[3], set(cached[4])
+        
+        scanned_at = time.time_ns()
+        result = _try_scan_code_file(path)
+        if result is not None:
+            self._file_cache[key] = [st.st_mtime_ns, st.st_size, scanned_at,
+                                     result[0], sorted(result[1])]
+        return result
+    
+    def _load_file_cache(self) -> Dict[str, list]:
+        """Load the per-file scan cache; empty if missing, corrupt or stale"""
+        try:
+            with open(self._file_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != _FILE_CACHE_VERSION:
+            return {}
+        return data.get('files', {})
+    
+    def _save_file_cache(self):
+        """Persist cache entries for the files seen in this scan"""
+        files = {k: v for k, v in self._file_cache.items() if k in self._file_cache_seen}
+        tmp_path = self._file_cache_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': _FILE_CACHE_VERSION, 'files': files}, f)
+            os.replace(tmp_path, self._file_cache_path)
+        except OSError:
+            pass  # Cache is an optimization only
     
     def _compute_module_confidence(self, file_analysis: Dict) -> float:
         """Compute confidence in module analysis"""
@@ -687,33 +827,58 @@ class LongCoTScanner:
     
     def _compute_final_confidence(self) -> float:
         """Compute final confidence score"""
-        if not self.current_chain.confidence_trajectory:
+        trajectory = self.current_chain.confidence_trajectory
+        n = len(trajectory)
+        if not n:
             return 0.0
-        # Weight recent steps more heavily
-        weights = [i / len(self.current_chain.confidence_trajectory) for i in range(1, len(self.current_chain.confidence_trajectory) + 1)]
-        weighted_sum = sum(c * w for c, w in zip(self.current_chain.confidence_trajectory, weights))
-        return weighted_sum / sum(weights)
+        # Weight recent steps more heavily: step k gets weight k, and the
+        # weights 1..n sum to n(n+1)/2
+        weighted_sum = sum(c * k for k, c in enumerate(trajectory, 1))
+        return weighted_sum / (n * (n + 1) / 2)
     
     def _save_longcot_reports(self, results: Dict):
-        """Save comprehensive Long CoT reports"""
+        """Save comprehensive Long CoT reports
+
+        Serialization and disk writes run on a background thread so the
+        scan returns without waiting for them. Callers must call close()
+        once done with the scan: it waits for the files, reports where
+        they were saved and raises any write error. Results must not be
+        mutated until then.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._pending_reports.append(
+            self._io_pool.submit(self._write_longcot_reports, results, timestamp)
+        )
+    
+    def _write_longcot_reports(self, results: Dict, timestamp: str):
+        """Write the three report files (runs on the report thread)"""
         # 1. JSON report with full reasoning chain
         json_file = self.longcot_dir / f"scan_{timestamp}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, default=str)
+        with open(json_file, 'wb', buffering=_WRITE_BUFFER) as f:
+            f.write(_dump_report(results))
         
         # 2. Markdown report with narrative reasoning
         md_file = self.longcot_dir / f"scan_{timestamp}.md"
-        with open(md_file, 'w', encoding='utf-8') as f:
+        with open(md_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
             f.write(self._generate_narrative_report(results))
         
         # 3. Reasoning trace visualization
         trace_file = self.longcot_dir / f"trace_{timestamp}.md"
-        with open(trace_file, 'w', encoding='utf-8') as f:
+        with open(trace_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
             f.write(self._generate_reasoning_trace(results))
-        
-        print(f"\n📄 Reports saved to {self.longcot_dir}/")
+    
+    def close(self):
+        """Wait for background report writes; re-raises a failed write."""
+        pending, self._pending_reports = self._pending_reports, []
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+        for future in pending:
+            future.result()
+        if pending:
+            print(f"\n📄 Reports saved to {self.longcot_dir}/")
     
     def _generate_narrative_report(self, results: Dict) -> str:
         """Generate human-readable narrative of the reasoning process"""
@@ -836,6 +1001,9 @@ def integrate_with_vibecode():
     # Run Long CoT scan
     results = scanner.scan_with_longcot()
     
+    # Wait for the report files (written in the background)
+    scanner.close()
+    
     # Access reasoning chain
     print(f"Reasoning depth: {results['reasoning_chain']['total_steps']}")
     print(f"Confidence: {results['statistics']['avg_confidence']:.1%}")
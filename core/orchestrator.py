@@ -146,6 +146,9 @@ class Orchestrator:
             print(f"   • Modules Analyzed: {len(self.longcot_analysis['modules'])}")
             print(f"   • Critical Paths: {len(self.longcot_analysis['critical_paths']['core_modules'])}")
             
+            # Reports are written in the background; a write error lands in except below
+            self.longcot_scanner.close()
+            
             # Save to state for future reference
             self.state['longcot_scan'] = {
                 'completed': True,
@@ -465,8 +468,8 @@ class Orchestrator:
         print(f"   • Errors: {len(results['errors'])}")
         print(f"{'='*60}\n")
 
-        # Save artifact registry manifest
-        self.artifact_registry.save_manifest()
+        # Save artifact registry manifest and close the run archive
+        self.artifact_registry.finish_run()
 
         return results
 
@@ -93,6 +93,8 @@ def main():
     print("   ✅ Hierarchical understanding")
     print("   ✅ Critical path identification")
     
+    scanner.close()  # wait for the report files
+    
     print("\n" + "=" * 70)
     print(f"  Reports saved to: {scanner.longcot_dir}/")
     print("=" * 70)
@@ -14,7 +14,7 @@ import shutil
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from core.autonomy_config import AutonomyConfig
+from core.autonomy_config import AutonomyConfig, flush_audit_logs, verify_audit_chain
 
 
 class TestAutonomyConfig:
@@ -166,6 +166,8 @@ class TestAutonomyConfig:
             reason="High confidence"
         )
 
+        flush_audit_logs()
+
         # Verify log file was created
         assert log_path.exists()
 
@@ -194,6 +196,8 @@ class TestAutonomyConfig:
                 reason=f"Reason {i}"
             )
 
+        flush_audit_logs()
+
         # Verify all entries were logged
         with open(log_path, 'r') as f:
             lines = f.readlines()
@@ -240,11 +244,98 @@ class TestAutonomyConfig:
             reason="Test reason"
         )
 
+        flush_audit_logs()
+
         # Verify valid JSON
         with open(log_path, 'r') as f:
             entry = json.loads(f.readline())
             assert isinstance(entry, dict)
 
+    @pytest.mark.unit
+    def test_log_decision_hash_chain(self, temp_workspace):
+        """Test that entries are hash-chained and edits are detected."""
+        (temp_workspace / "sub").mkdir()
+        log_path = temp_workspace / "audit.log"
+        # Writes through another spelling of the same file continue one chain
+        aliases = [log_path, temp_workspace / "sub" / ".." / "audit.log", log_path]
+        config = AutonomyConfig()
+
+        for i, path in enumerate(aliases):
+            config.log_decision(path, f"task_{i}", 0.9, True, "ok")
+        flush_audit_logs()
+
+        lines = log_path.read_text().splitlines()
+        assert json.loads(lines[0])["prev_hash"] == "00" * 32
+        assert verify_audit_chain(log_path)
+
+        lines[1] = lines[1].replace("task_1", "task_X")
+        log_path.write_text("\n".join(lines) + "\n")
+        assert not verify_audit_chain(log_path)
+
+    @pytest.mark.unit
+    def test_log_decision_path_aliases_share_chain(self, temp_workspace, monkeypatch):
+        """Test that two spellings of one log share a descriptor and a chain."""
+        (temp_workspace / "sub").mkdir()
+        log_path = temp_workspace / "logs" / "audit.log"
+        alias = temp_workspace / "sub" / ".." / "logs" / "audit.log"
+        config = AutonomyConfig()
+
+        config.log_decision(log_path, "direct", 0.9, True, "ok")
+        config.log_decision(alias, "aliased", 0.9, True, "ok")
+        monkeypatch.chdir(temp_workspace)
+        config.log_decision(Path("logs") / "audit.log", "relative", 0.9, True, "ok")
+        flush_audit_logs()
+
+        entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert [e["task_type"] for e in entries] == ["direct", "aliased", "relative"]
+        assert verify_audit_chain(log_path)
+
+    @pytest.mark.unit
+    def test_log_decision_after_rotation(self, temp_workspace):
+        """Test that a rotated or deleted log is reopened with a fresh chain."""
+        log_path = temp_workspace / "audit.log"
+        rotated = temp_workspace / "audit.log.1"
+        config = AutonomyConfig()
+
+        config.log_decision(log_path, "before", 0.9, True, "ok")
+        flush_audit_logs()
+        log_path.rename(rotated)
+
+        config.log_decision(log_path, "after_rotate", 0.9, True, "ok")
+        config.log_decision(log_path, "after_rotate_2", 0.9, True, "ok")
+        flush_audit_logs()
+        log_path.unlink()
+
+        config.log_decision(log_path, "after_delete", 0.9, True, "ok")
+        flush_audit_logs()
+
+        assert [json.loads(line)["task_type"] for line in rotated.read_text().splitlines()] == ["before"]
+        entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert [e["task_type"] for e in entries] == ["after_delete"]
+        assert entries[0]["prev_hash"] == "00" * 32
+        assert verify_audit_chain(rotated)
+        assert verify_audit_chain(log_path)
+
+    @pytest.mark.unit
+    def test_log_decision_flushes_after_interval(self, temp_workspace):
+        """Test that buffered entries reach disk without an explicit flush."""
+        import time
+        log_path = temp_workspace / "audit.log"
+        config = AutonomyConfig()
+
+        config.log_decision(
+            log_path=log_path,
+            task_type="test_task",
+            confidence=0.75,
+            approved=False,
+            reason="Test reason"
+        )
+
+        deadline = time.time() + 5
+        while log_path.stat().st_size == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        assert json.loads(log_path.read_text())["task_type"] == "test_task"
+
     @pytest.mark.unit
     def test_confidence_threshold_edge_cases(self):
         """Test edge cases for confidence threshold."""
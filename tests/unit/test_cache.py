@@ -58,6 +58,29 @@ class TestPromptCache:
         assert cache.get("key2") == "value2"
         assert cache.get("key3") == "value3"
 
+    @pytest.mark.unit
+    def test_lru_eviction_respects_recent_access(self):
+        """Test that a recently read entry survives eviction."""
+        cache = PromptCache(max_size=2)
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.get("key1")  # key2 is now least recently used
+        cache.set("key3", "value3")
+        assert cache.get("key2") is None
+        assert cache.get("key1") == "value1"
+        assert cache.get("key3") == "value3"
+
+    @pytest.mark.unit
+    def test_overwrite_does_not_evict(self):
+        """Test that re-setting an existing key does not evict others."""
+        cache = PromptCache(max_size=2)
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key1", "updated")
+        assert cache.size == 2
+        assert cache.get("key2") == "value2"
+        assert cache.get("key1") == "updated"
+
     @pytest.mark.unit
     def test_clear(self):
         """Test cache clearing."""
@@ -115,6 +138,35 @@ class TestResultCache:
         cache.clear()
         assert cache.get("op") is None
 
+    @pytest.mark.unit
+    def test_purge_expired(self):
+        """Test that expired entries are removed without being accessed."""
+        cache = ResultCache()
+        cache.set("short", "a", ttl=0.05)
+        cache.set("long", "b", ttl=60)
+        cache.set("short", "c", ttl=60)  # Overwrite: old expiry is stale
+        cache.set("gone", "d", ttl=0.05, files=["x.py"])
+        time.sleep(0.1)
+
+        assert cache.purge_expired() == 1
+        assert cache.size == 2
+        assert cache.get("short") == "c"
+        assert cache.invalidate_by_file("x.py") == 0
+
+    @pytest.mark.unit
+    def test_invalidate_by_file(self):
+        """Test that only entries registered for a file are invalidated."""
+        cache = ResultCache()
+        cache.set("lint", {"ok": True}, "a.py", files=["src/a.py"])
+        cache.set("lint", {"ok": False}, "b.py", files=["src/b.py"])
+        cache.set("deps", ["x"], files=["src/a.py", "src/b.py"])
+
+        assert cache.invalidate_by_file("src/a.py") == 2
+        assert cache.get("lint", "a.py") is None
+        assert cache.get("deps") is None
+        assert cache.get("lint", "b.py") == {"ok": False}
+        assert cache.invalidate_by_file("src/a.py") == 0
+
 
 class TestFileHashCache:
     """Test suite for FileHashCache class."""
@@ -127,7 +179,7 @@ class TestFileHashCache:
         test_file.write_text("hello")
         hash1 = cache.get_hash(test_file)
         assert hash1 != ""
-        assert len(hash1) == 32  # MD5 hex length
+        assert len(hash1) == 32  # 128-bit digest, hex encoded
 
     @pytest.mark.unit
     def test_has_changed_detects_change(self, temp_workspace):
@@ -160,6 +212,49 @@ class TestFileHashCache:
         assert prev is not None
         assert len(prev) == 32
 
+    @pytest.mark.unit
+    def test_unchanged_file_not_rehashed(self, temp_workspace, monkeypatch):
+        """Test that an old file with the same mtime/size reuses its hash."""
+        import os
+        import core.cache as cache_module
+        calls = []
+        real_hash_file = cache_module._hash_file
+
+        def counting_hash_file(path):
+            calls.append(path)
+            return real_hash_file(path)
+        monkeypatch.setattr(cache_module, "_hash_file", counting_hash_file)
+
+        test_file = temp_workspace / "test.txt"
+        test_file.write_text("hello")
+        os.utime(test_file, (time.time() - 60, time.time() - 60))
+
+        cache = FileHashCache()
+        assert cache.get_hash(test_file) == cache.get_hash(test_file)
+        assert len(calls) == 1
+
+        # Strong mode ignores the stat fast path
+        strong = FileHashCache(strong=True)
+        strong.get_hash(test_file)
+        strong.get_hash(test_file)
+        assert len(calls) == 3
+
+    @pytest.mark.unit
+    def test_hash_many(self, temp_workspace):
+        """Test that hash_many matches get_hash for every path."""
+        cache = FileHashCache()
+        paths = []
+        for i in range(10):
+            path = temp_workspace / f"file{i}.txt"
+            path.write_text("content %d" % i)
+            paths.append(path)
+        paths.append(temp_workspace / "missing.txt")
+
+        hashes = cache.hash_many(paths)
+        assert len(hashes) == 11
+        assert hashes[str(paths[3])] == FileHashCache().get_hash(paths[3])
+        assert hashes[str(paths[-1])] == ""
+
     @pytest.mark.unit
     def test_non_existent_file(self, temp_workspace):
         """Test hash for non-existent file."""
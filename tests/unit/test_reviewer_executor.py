@@ -0,0 +1,85 @@
+"""
+Unit tests for ReviewerExecutor.
+
+Tests the static security checks.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.agents.reviewer_executor import ReviewerExecutor
+
+
+def _messages(issues):
+    return [message.split(': ', 1)[1] for message, _, _ in issues]
+
+
+class TestSecurityChecks:
+    """Test suite for ReviewerExecutor._security_checks."""
+
+    @pytest.mark.unit
+    def test_overlapping_patterns_both_reported(self, temp_workspace):
+        """A match for one pattern does not hide another over the same text."""
+        reviewer = ReviewerExecutor(temp_workspace)
+        data = b'<div dangerouslySetInnerHTML={{ __html: body }} />\n'
+
+        messages = _messages(reviewer._security_checks(data, 'page.tsx'))
+        assert messages == ['innerHTML can lead to XSS', 'dangerouslySetInnerHTML is risky']
+
+    @pytest.mark.unit
+    def test_patterns_after_greedy_match_reported(self, temp_workspace):
+        """sql_injection's greedy match does not hide later hits on its line."""
+        reviewer = ReviewerExecutor(temp_workspace)
+        data = b'db.query(`SELECT ${id}`); eval(code); console.log(id)\n'
+
+        messages = _messages(reviewer._security_checks(data, 'db.js'))
+        assert messages == [
+            'Use of eval() is dangerous',
+            'Possible SQL injection',
+            'Console.log should be removed in production',
+        ]
+
+
+class TestSourceFiles:
+    """Test suite for ReviewerExecutor source file discovery."""
+
+    @pytest.mark.unit
+    def test_virtualenv_skipped(self, temp_workspace):
+        """A .venv tree does not crowd real sources out of the file cap."""
+        site = temp_workspace / '.venv' / 'lib' / 'site'
+        site.mkdir(parents=True)
+        for i in range(120):
+            (site / f'mod_{i}.py').write_text("x = 1\n")
+        (temp_workspace / 'src').mkdir()
+        (temp_workspace / 'src' / 'app.py').write_text("eval(x)\n")
+        reviewer = ReviewerExecutor(temp_workspace)
+
+        files = reviewer._get_source_files()
+        assert files == [str(temp_workspace / 'src' / 'app.py')]
+
+        security, _, _ = reviewer._review_files(files)
+        assert _messages(security) == ['Use of eval() is dangerous']
+
+
+class TestReviewCache:
+    """Test suite for the per-file review cache."""
+
+    @pytest.mark.unit
+    def test_same_size_rewrite_rescanned(self, temp_workspace):
+        """A same-size edit that keeps the mtime is not served from the cache."""
+        import os
+        path = temp_workspace / 'app.py'
+        path.write_text("load(x)\n")
+        reviewer = ReviewerExecutor(temp_workspace)
+
+        security, _, _ = reviewer._review_files([str(path)])
+        assert security == []
+
+        st = path.stat()
+        path.write_text("eval(x)\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        security, _, _ = reviewer._review_files([str(path)])
+        assert _messages(security) == ['Use of eval() is dangerous']
@@ -0,0 +1,169 @@
+"""
+Unit tests for ShipperExecutor.
+
+Tests the release security scan.
+"""
+
+import json
+import time
+
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.agents import shipper_executor
+from core.agents.shipper_executor import ShipperExecutor
+
+
+@pytest.fixture(params=['python', 'ripgrep'])
+def shipper(request, temp_workspace, monkeypatch):
+    """ShipperExecutor on an empty workspace, scanning via each backend."""
+    if request.param == 'python':
+        monkeypatch.setattr(shipper_executor.shutil, 'which', lambda name: None)
+    elif shipper_executor.shutil.which('rg') is None:
+        pytest.skip("ripgrep not installed")
+    return ShipperExecutor(temp_workspace)
+
+
+class TestSecurityScan:
+    """Test suite for ShipperExecutor._security_scan."""
+
+    @pytest.mark.unit
+    def test_line_ending_in_env_passes(self, shipper):
+        """A source line ending in .env is not a forbidden pattern."""
+        (shipper.workspace / 'src').mkdir()
+        (shipper.workspace / 'src' / 'app.py').write_text(
+            "load_dotenv()  # reads .env\nrun()\n"
+        )
+        (shipper.workspace / '.gitignore').write_text(".env\n")
+
+        assert shipper._security_scan() == (True, "No security issues detected")
+
+    @pytest.mark.unit
+    def test_file_ending_in_env_flagged(self, shipper):
+        """A file whose text ends in .env still matches, as before."""
+        (shipper.workspace / 'config.py').write_text("ENV_FILE = '.env.local'\nname = .env\n")
+        (shipper.workspace / '.gitignore').write_text(".env\n")
+
+        assert shipper._security_scan() == (False, "1 security issues found")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('pattern', ['.env', '/.env', '**/.env', '.env*', '**/.env*'])
+    def test_env_gitignore_patterns(self, shipper, pattern):
+        """Anchored and any-depth .gitignore patterns cover root env files."""
+        (shipper.workspace / '.env').write_text("TOKEN=abc\n")
+        (shipper.workspace / '.gitignore').write_text(f"node_modules/\n{pattern}\n")
+
+        assert shipper._security_scan() == (True, "No security issues detected")
+
+    @pytest.mark.unit
+    def test_unreadable_file_reported(self, shipper):
+        """A source file that cannot be read is an issue, not a clean file."""
+        (shipper.workspace / 'gone.py').symlink_to(shipper.workspace / 'missing.py')
+        (shipper.workspace / '.gitignore').write_text(".env\n")
+
+        assert shipper._security_scan() == (False, "1 security issues found")
+
+
+class TestNpmInstall:
+    """Test suite for ShipperExecutor._verify_npm_install."""
+
+    @staticmethod
+    def _record_installs(shipper, monkeypatch):
+        """Replace _npm_install with a stub recording order and overlap."""
+        calls, active, overlap = [], [0], [0]
+        lock = shipper_executor.Lock()
+
+        def fake_install(loc):
+            with lock:
+                active[0] += 1
+                overlap[0] = max(overlap[0], active[0])
+                calls.append('root' if loc == shipper.workspace else loc.name)
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return None
+
+        monkeypatch.setattr(shipper, '_npm_install', fake_install)
+        return calls, overlap
+
+    @staticmethod
+    def _write_packages(workspace, root_pkg):
+        for name in ('frontend', 'backend'):
+            (workspace / name).mkdir()
+            (workspace / name / 'package.json').write_text(json.dumps({'name': name}))
+        (workspace / 'package.json').write_text(json.dumps(root_pkg))
+
+    @pytest.mark.unit
+    def test_workspaces_root_installs_alone(self, temp_workspace, monkeypatch):
+        """A workspaces root runs only its own install, never concurrently."""
+        shipper = ShipperExecutor(temp_workspace)
+        self._write_packages(temp_workspace, {'workspaces': ['frontend', 'backend']})
+        calls, overlap = self._record_installs(shipper, monkeypatch)
+
+        assert shipper._verify_npm_install() == (True, "Dependencies installed successfully")
+        assert calls == ['root']
+        assert overlap[0] == 1
+
+    @pytest.mark.unit
+    def test_root_lockfile_covering_children_installs_alone(self, temp_workspace, monkeypatch):
+        """A root lockfile listing the subfolders also skips the child installs."""
+        shipper = ShipperExecutor(temp_workspace)
+        self._write_packages(temp_workspace, {'name': 'app'})
+        (temp_workspace / 'package-lock.json').write_text(
+            json.dumps({'packages': {'': {}, 'frontend': {}, 'backend': {}}})
+        )
+        calls, overlap = self._record_installs(shipper, monkeypatch)
+
+        shipper._verify_npm_install()
+        assert calls == ['root']
+
+    @pytest.mark.unit
+    def test_root_package_installs_one_at_a_time(self, temp_workspace, monkeypatch):
+        """With a plain root package.json, every location installs in turn."""
+        shipper = ShipperExecutor(temp_workspace)
+        self._write_packages(temp_workspace, {'name': 'app'})
+        calls, overlap = self._record_installs(shipper, monkeypatch)
+
+        shipper._verify_npm_install()
+        assert calls == ['root', 'frontend', 'backend']
+        assert overlap[0] == 1
+
+    @pytest.mark.unit
+    def test_independent_packages_install_in_parallel(self, temp_workspace, monkeypatch):
+        """Without a root package.json, frontend and backend install side by side."""
+        shipper = ShipperExecutor(temp_workspace)
+        self._write_packages(temp_workspace, {})
+        (temp_workspace / 'package.json').unlink()
+        calls, overlap = self._record_installs(shipper, monkeypatch)
+
+        shipper._verify_npm_install()
+        assert sorted(calls) == ['backend', 'frontend']
+        assert overlap[0] == 2
+
+
+class TestPipelineTimeout:
+    """Test suite for the ShipperExecutor.execute timeout path."""
+
+    @pytest.mark.unit
+    def test_timeout_reports_finished_failures(self, temp_workspace, monkeypatch):
+        """Phases that finished before the timeout still surface as blockers."""
+        shipper = ShipperExecutor(temp_workspace, max_pipeline_seconds=0.2)
+        release = shipper_executor.Event()
+        monkeypatch.setattr(shipper, '_verify_npm_install', lambda: (False, "lockfile conflict"))
+        monkeypatch.setattr(shipper, '_verify_build', lambda: (release.wait(5), "Build successful"))
+        monkeypatch.setattr(shipper, '_security_scan', lambda: (False, "2 security issues found"))
+        monkeypatch.setattr(shipper, '_check_documentation', lambda: (True, "Documentation complete"))
+
+        try:
+            result = shipper.execute("ship", {})
+        finally:
+            release.set()
+
+        report = result.artifacts[0].content
+        assert result.status == "failed"
+        assert "Install failed: lockfile conflict" in report
+        assert "Security issues: 2 security issues found" in report
+        assert "Pipeline timeout" in report
+        assert result.insights[1] == "3 blocking issue(s)"